@@ -0,0 +1,4 @@
+"""
+Offline benchmarks for the Epoch status monitor.
+Run with: python -m benchmarks.run
+"""
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Local stand-ins for both status websites and Discord
+One HTTP server on localhost answers like epoch.strykersoft.us (the HTML
+status page at /), epoch-status.info (the tRPC getStatus and a large
+getUptimeHistory under /api/trpc/) and a Discord webhook sink
+(POST /api/webhooks/<id>/<token>). Latency, error rate and 429 rate are
+configurable per side, and realm statuses can be flipped while it runs.
+"""
+
+import json
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Configuration
+UPTIME_HISTORY_DAYS = 7
+UPTIME_HISTORY_STEP = 60  # seconds between uptime history samples
+PAGE_PADDING_ROWS = 200  # filler table rows, so the page is about the size of the real one
+
+# Realm name -> (strykersoft div ID, epoch-status.info key)
+REALMS = {
+    "Auth": ("Auth Server", "auth"),
+    "Kezan": ("Kezan (PvE)", "world1"),
+}
+
+class QuietServer(ThreadingHTTPServer):
+    """Clients hanging up mid-request are expected when a benchmark stops"""
+
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        if not isinstance(sys.exc_info()[1], (ConnectionError, TimeoutError)):
+            super().handle_error(request, client_address)
+
+class Behaviour:
+    """How one side of the fake misbehaves"""
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, rate_limit_rate=0.0, retry_after=0.05):
+        self.latency = latency  # seconds added to every response
+        self.jitter = jitter  # up to this many extra seconds, uniformly random
+        self.error_rate = error_rate  # fraction of requests answered with HTTP 500
+        self.rate_limit_rate = rate_limit_rate  # fraction answered with HTTP 429 (Discord only)
+        self.retry_after = retry_after  # seconds Discord asks to wait on a 429
+
+    def wait(self):
+        delay = self.latency + (random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay > 0:
+            time.sleep(delay)
+
+def build_uptime_history(days=UPTIME_HISTORY_DAYS, step=UPTIME_HISTORY_STEP):
+    """A getUptimeHistory-sized payload: one sample per step for every realm"""
+    end = datetime.now(timezone.utc)
+    samples = []
+    for index in range(int(days * 86400 / step)):
+        timestamp = end - timedelta(seconds=index * step)
+        samples.append({"timestamp": timestamp.isoformat(),
+                        **{key: random.random() > 0.01 for _, key in REALMS.values()}})
+    return samples
+
+class FakeUpstream:
+    """The fake servers and their shared state"""
+
+    def __init__(self, status=None, discord=None, vary_content=False):
+        self.status_behaviour = status or Behaviour()
+        self.discord_behaviour = discord or Behaviour()
+        self.vary_content = vary_content  # change the body on every request, defeating conditional GET
+        self.statuses = {realm: "UP" for realm in REALMS}
+        self.flipped_at = {}  # realm -> time.monotonic() of its last flip
+        self.lock = threading.Lock()
+        self.requests = {"page": 0, "status": 0, "uptime": 0, "webhook": 0}
+        self.webhooks = []  # (time.monotonic(), payload) of every accepted post
+        self.rejected = {"errors": 0, "rate_limited": 0}
+        self.uptime_history = json.dumps([{"result": {"data": {"json": build_uptime_history()}}}],
+                                         separators=(',', ':')).encode()
+        self.server = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def set_status(self, realm, status):
+        """Change a realm's status as both sites report it"""
+        with self.lock:
+            if self.statuses[realm] != status:
+                self.statuses[realm] = status
+                self.flipped_at[realm] = time.monotonic()
+
+    def count(self, kind):
+        with self.lock:
+            self.requests[kind] += 1
+            return self.requests[kind]
+
+    def status_page(self):
+        with self.lock:
+            statuses = dict(self.statuses)
+        rows = ''.join(f"<tr><td>Row {index}</td><td>Lorem ipsum dolor sit amet</td></tr>"
+                       for index in range(PAGE_PADDING_ROWS))
+        divs = ''.join(f'<div class="server"><h3>{realm}</h3><div id="{div_id}">{statuses[realm].title()}</div></div>'
+                       for realm, (div_id, _) in REALMS.items())
+        nonce = f"<!-- {self.requests['page']} -->" if self.vary_content else ""
+        return (f"<!DOCTYPE html><html><head><title>Epoch Status</title></head><body>{nonce}"
+                f"<h1>Project Epoch Server Status</h1>{divs}<table>{rows}</table></body></html>").encode()
+
+    def status_json(self):
+        with self.lock:
+            data = {key: self.statuses[realm] == "UP" for realm, (_, key) in REALMS.items()}
+        if self.vary_content:
+            data["checkedAt"] = self.requests["status"]
+        # Compact, like the JSON.stringify output of the real API
+        return json.dumps([{"result": {"data": {"json": data}}}], separators=(',', ':')).encode()
+
+    def start(self):
+        upstream = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Send headers and body in one segment, as real servers do; otherwise
+            # Nagle and delayed ACKs add ~40 ms to every keep-alive request
+            wbufsize = -1
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                behaviour = upstream.status_behaviour
+                path = self.path.split('?')[0]
+                if path == '/':
+                    upstream.count("page")
+                    content_type, body = 'text/html; charset=utf-8', None
+                elif path == '/api/trpc/post.getStatus':
+                    upstream.count("status")
+                    content_type, body = 'application/json', None
+                elif path == '/api/trpc/post.getUptimeHistory':
+                    upstream.count("uptime")
+                    content_type, body = 'application/json', upstream.uptime_history
+                else:
+                    self.reply(404, b'', 'text/plain')
+                    return
+
+                behaviour.wait()
+                if random.random() < behaviour.error_rate:
+                    self.reply(500, b'Internal Server Error', 'text/plain')
+                    return
+                if body is None:
+                    body = upstream.status_page() if path == '/' else upstream.status_json()
+                self.reply(200, body, content_type)
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                payload = json.loads(self.rfile.read(length) or b'{}')
+                if not self.path.startswith('/api/webhooks/'):
+                    self.reply(404, b'', 'text/plain')
+                    return
+
+                upstream.count("webhook")
+                behaviour = upstream.discord_behaviour
+                behaviour.wait()
+                roll = random.random()
+                if roll < behaviour.rate_limit_rate:
+                    upstream.rejected["rate_limited"] += 1
+                    body = json.dumps({"message": "You are being rate limited.",
+                                       "retry_after": behaviour.retry_after, "global": False}).encode()
+                    self.reply(429, body, 'application/json', {'Retry-After': str(behaviour.retry_after)})
+                    return
+                if roll < behaviour.rate_limit_rate + behaviour.error_rate:
+                    upstream.rejected["errors"] += 1
+                    self.reply(500, b'{"message": "Internal Server Error"}', 'application/json')
+                    return
+
+                with upstream.lock:
+                    upstream.webhooks.append((time.monotonic(), payload))
+                self.reply(204, b'', 'application/json',
+                           {'X-RateLimit-Limit': '5', 'X-RateLimit-Remaining': '4', 'X-RateLimit-Reset-After': '0.1'})
+
+            def reply(self, status, body, content_type, headers=None):
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = QuietServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self.server.serve_forever, name='fake-upstream', daemon=True).start()
+        return self
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
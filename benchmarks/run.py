@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""
+Epoch Status Benchmarks
+Runs the monitor against the local fake servers and reports:
+  - checks/sec of each source adapter, with content that changes on every
+    request (full parse) and content that never changes (skipped by the
+    conditional GET / body hash)
+  - checks/sec of the whole engine running several monitors at once
+  - upstream requests per check with many monitors on each site, with each
+    fetch cache backend and without one
+  - decode time and peak memory of the tRPC responses, including a batch
+    carrying both the status and the large uptime history
+  - detection latency (realm flips upstream -> message queued) and delivery
+    latency (queued -> received by the Discord sink), on a clean network
+    and with upstream and Discord errors, latency and 429s
+  - startup time of a fresh interpreter: importing the application and
+    finishing the first check
+
+Usage (from the repository root):
+    python -m benchmarks.run
+    python -m benchmarks.run --json results.json
+    python -m benchmarks.run --baseline results.json --tolerance 0.2
+    python -m benchmarks.run --engine mypackage.engine:run_all
+"""
+
+import argparse
+import asyncio
+import contextlib
+import importlib
+import io
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from epoch_status.debounce import Debouncer
+from epoch_status.delivery import DeliveryQueue, WebhookTarget
+from epoch_status.engine import Monitor
+from epoch_status.fetch_cache import create_cache
+from epoch_status.history import HistoryWriter
+from epoch_status.http_client import get_client, set_fetch_cache
+from epoch_status.scheduler import AdaptiveScheduler
+from epoch_status.json_decode import loads, BACKEND as JSON_BACKEND
+from epoch_status.sources.epoch_info import EpochInfoSource, TRPC_BATCH_INPUT, decode_trpc_result, get_trpc_result
+from epoch_status.sources.strykersoft import StrykersoftSource
+from epoch_status.state import StateStore
+from .fake_servers import Behaviour, FakeUpstream
+
+# Configuration
+DEFAULT_ENGINE = 'epoch_status.engine:run_all'
+THROUGHPUT_SECONDS = 3.0  # how long each throughput measurement runs
+ENGINE_MONITORS = 8  # monitors run at once in the engine throughput benchmark
+SHARED_MONITORS = 8  # monitors per site in the fetch cache benchmark
+SHARED_INTERVAL = 0.1  # seconds between checks of each of those monitors
+SHARED_TTL = 0.5  # fetch cache TTL in that benchmark
+LATENCY_INTERVAL = 0.1  # seconds between checks in the latency benchmarks
+LATENCY_FLIPS = 10  # realm flips measured per latency benchmark
+FLIP_TIMEOUT = 60  # seconds to wait for one flip to reach the sink
+DECODE_SECONDS = 0.5  # how long each decode measurement runs
+STARTUP_RUNS = 5  # fresh interpreters started by the startup benchmark, the fastest counts
+
+# Run in a fresh interpreter: import the application, then check the fake upstream once
+STARTUP_SCRIPT = """
+import sys, time
+started = time.perf_counter()
+import epoch_status.app
+from epoch_status.sources import get_source
+imported = time.perf_counter()
+source = get_source('https://epoch-status.info/')
+source.status_api_url = sys.argv[1] + '/api/trpc/post.getStatus'
+source.fetch_status()
+print((imported - started) * 1000, (time.perf_counter() - started) * 1000)
+"""
+
+class TimedDeliveryQueue(DeliveryQueue):
+    """DeliveryQueue that notes when each message was queued"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.submitted_at = []
+
+    def submit(self, message, target):
+        self.submitted_at.append(time.monotonic())
+        return super().submit(message, target)
+
+def load_engine(spec):
+    """Import an engine coroutine function from "module:function" """
+    module_name, _, function_name = spec.partition(':')
+    return getattr(importlib.import_module(module_name), function_name or 'run_all')
+
+def make_sources(upstream):
+    """Source adapters pointed at the fake servers"""
+    strykersoft = StrykersoftSource()
+    strykersoft.url = upstream.base_url + '/'
+    epoch_info = EpochInfoSource()
+    epoch_info.status_api_url = upstream.base_url + '/api/trpc/post.getStatus'
+    return {"strykersoft": strykersoft, "epoch_info": epoch_info}
+
+def fetch_uptime_history(upstream):
+    """Fetch and decode the fake server's uptime history, the way the site serves it"""
+    response = get_client().get(upstream.base_url + '/api/trpc/post.getUptimeHistory',
+                                params={"batch": "1", "input": TRPC_BATCH_INPUT})
+    response.raise_for_status()
+    return get_trpc_result(loads(response.content))
+
+def make_monitor(source, name, interval):
+    realms = list(source.realms)
+    return Monitor(source.url, source.fetch_status, realms, interval, name=name,
+                   scheduler=AdaptiveScheduler(interval, interval, name=name),
+                   sources=[source], debouncer=Debouncer(realms))
+
+def percentile(values, fraction):
+    values = sorted(values)
+    if not values:
+        return float('nan')
+    return values[min(int(fraction * len(values)), len(values) - 1)]
+
+def bench_source_throughput(vary_content, seconds):
+    """checks/sec of each source adapter called in a tight loop"""
+    results = {}
+    upstream = FakeUpstream(vary_content=vary_content).start()
+    try:
+        for key, source in make_sources(upstream).items():
+            checks = 0
+            deadline = time.perf_counter() + seconds
+            started = time.perf_counter()
+            while time.perf_counter() < deadline:
+                source.fetch_status(cache_key=f"bench-{key}")
+                checks += 1
+            label = "changing" if vary_content else "unchanged"
+            results[f"{key}.{label}.checks_per_sec"] = checks / (time.perf_counter() - started)
+
+        # The large uptime history, fetched and decoded
+        started = time.perf_counter()
+        fetches = 0
+        while time.perf_counter() - started < seconds / 3 or fetches == 0:
+            fetch_uptime_history(upstream)
+            fetches += 1
+        if vary_content:
+            results["epoch_info.uptime_history.fetch_ms"] = (time.perf_counter() - started) / fetches * 1000
+    finally:
+        upstream.stop()
+    return results
+
+def measure_decode(decode, body, seconds=DECODE_SECONDS):
+    """
+    Time one decode function on a body and measure its peak memory.
+
+    Returns:
+        tuple: (seconds per call, peak bytes allocated by one call)
+    """
+    calls = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < seconds or calls == 0:
+        decode(body)
+        calls += 1
+    elapsed = (time.perf_counter() - started) / calls
+
+    tracemalloc.start()
+    try:
+        decode(body)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return elapsed, peak
+
+def bench_decode():
+    """Decode time and peak memory per poll for the tRPC responses"""
+    upstream = FakeUpstream()
+    status = upstream.status_json()
+    uptime = upstream.uptime_history
+    # Both procedures in one batch, as a single combined request would return them
+    batch = status[:-1] + b',' + uptime[1:]
+
+    results = {}
+    for label, decode, body in [("status", decode_trpc_result, status),
+                                ("batch", decode_trpc_result, batch),
+                                ("uptime_history", lambda body: get_trpc_result(loads(body)), uptime)]:
+        elapsed, peak = measure_decode(decode, body)
+        results[f"decode.{label}_us"] = elapsed * 1e6
+        results[f"decode.{label}_peak_kib"] = peak / 1024
+    return results
+
+async def run_engine(engine, monitors, delivery, targets, workdir, until):
+    """Run an engine until until() is true, then cancel it"""
+    store = StateStore(os.path.join(workdir, 'state.json'))
+    history = HistoryWriter(os.path.join(workdir, 'history.bin'))
+    task = asyncio.ensure_future(engine(monitors, delivery, targets, store, history))
+    try:
+        await until()
+    finally:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+        for worker in delivery.workers.values():
+            worker.cancel()
+        history.close()
+
+def bench_engine_throughput(engine, seconds, workdir):
+    """checks/sec of the engine running several monitors with no wait between checks"""
+    upstream = FakeUpstream(vary_content=True).start()
+    try:
+        sources = list(make_sources(upstream).values())
+        monitors = [make_monitor(sources[index % len(sources)], f"bench#{index}", 0.001)
+                    for index in range(ENGINE_MONITORS)]
+        delivery = TimedDeliveryQueue(coalesce_window=0)
+        target = WebhookTarget(upstream.base_url + '/api/webhooks/1/benchmark')
+
+        async def until():
+            await asyncio.sleep(seconds)
+
+        started = time.perf_counter()
+        asyncio.run(run_engine(engine, monitors, delivery, [target], workdir, until))
+        elapsed = time.perf_counter() - started
+    finally:
+        upstream.stop()
+    return {"engine.checks_per_sec": sum(monitor.check_count for monitor in monitors) / elapsed}
+
+def free_port():
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+def bench_fetch_cache(engine, seconds, workdir):
+    """Upstream requests per check with many monitors per site, for each fetch cache backend"""
+    results = {}
+    for kind in ('off', 'memory', 'disk', 'socket'):
+        upstream = FakeUpstream(vary_content=True).start()
+        set_fetch_cache(create_cache(kind, SHARED_TTL, os.path.join(workdir, 'fetch-cache'), free_port()))
+        try:
+            sources = list(make_sources(upstream).values())
+            monitors = [make_monitor(source, f"{source.name}#{index}", SHARED_INTERVAL)
+                        for source in sources for index in range(SHARED_MONITORS)]
+            delivery = TimedDeliveryQueue(coalesce_window=0)
+            target = WebhookTarget(upstream.base_url + '/api/webhooks/1/benchmark')
+
+            async def until():
+                await asyncio.sleep(seconds)
+
+            asyncio.run(run_engine(engine, monitors, delivery, [target], workdir, until))
+            checks = sum(monitor.check_count for monitor in monitors)
+            requests = upstream.requests["page"] + upstream.requests["status"]
+            results[f"fetch_cache.{kind}.upstream_per_100_checks"] = 100 * requests / max(checks, 1)
+        finally:
+            set_fetch_cache(None)
+            upstream.stop()
+    return results
+
+def bench_latency(engine, label, workdir, status=None, discord=None, coalesce_window=0):
+    """Detection and delivery latency over a series of realm flips"""
+    upstream = FakeUpstream(status=status, discord=discord).start()
+    detection = []
+    delivery_latency = []
+    lost = 0
+    try:
+        monitors = [make_monitor(source, name, LATENCY_INTERVAL) for name, source in make_sources(upstream).items()]
+        delivery = TimedDeliveryQueue(coalesce_window=coalesce_window)
+        target = WebhookTarget(upstream.base_url + '/api/webhooks/1/benchmark')
+
+        async def until():
+            nonlocal lost
+            # Let every monitor take its baseline first
+            while any(monitor.previous is None for monitor in monitors):
+                await asyncio.sleep(LATENCY_INTERVAL)
+
+            for flip in range(LATENCY_FLIPS):
+                submitted = len(delivery.submitted_at)
+                finished = delivery.sent + delivery.failed
+                received = len(upstream.webhooks)
+                upstream.set_status("Kezan", "DOWN" if flip % 2 == 0 else "UP")
+                flipped_at = upstream.flipped_at["Kezan"]
+
+                # One message per monitor is expected for every flip, delivered or given up on
+                deadline = time.monotonic() + FLIP_TIMEOUT
+                while delivery.sent + delivery.failed < finished + len(monitors):
+                    if time.monotonic() > deadline:
+                        lost += 1
+                        break
+                    await asyncio.sleep(0.005)
+
+                new_submissions = delivery.submitted_at[submitted:]
+                detection.extend(at - flipped_at for at in new_submissions)
+                arrivals = [at for at, _ in upstream.webhooks[received:]]
+                if arrivals and new_submissions:
+                    delivery_latency.append(max(arrivals) - max(new_submissions))
+
+        asyncio.run(run_engine(engine, monitors, delivery, [target], workdir, until))
+    finally:
+        upstream.stop()
+
+    return {
+        f"{label}.detection_p50_ms": percentile(detection, 0.5) * 1000,
+        f"{label}.detection_p95_ms": percentile(detection, 0.95) * 1000,
+        f"{label}.delivery_p50_ms": percentile(delivery_latency, 0.5) * 1000,
+        f"{label}.delivery_p95_ms": percentile(delivery_latency, 0.95) * 1000,
+        f"{label}.lost_flips": lost,
+    }
+
+def bench_startup():
+    """Milliseconds from a fresh interpreter to the application imported and the first check done"""
+    upstream = FakeUpstream().start()
+    runs = []
+    try:
+        for _ in range(STARTUP_RUNS):
+            output = subprocess.run([sys.executable, '-c', STARTUP_SCRIPT, upstream.base_url],
+                                    capture_output=True, text=True, check=True).stdout
+            runs.append([float(value) for value in output.split()[-2:]])
+    finally:
+        upstream.stop()
+    return {
+        "startup.import_ms": min(run[0] for run in runs),
+        "startup.first_check_ms": min(run[1] for run in runs),
+    }
+
+def compare(results, baseline, tolerance):
+    """
+    Compare results with a baseline run.
+
+    Returns:
+        list: Descriptions of the metrics that got worse by more than tolerance
+    """
+    regressions = []
+    for name, value in results.items():
+        previous = baseline.get(name)
+        if previous is None or previous != previous or value != value:
+            continue
+        higher_is_better = name.endswith('_per_sec')
+        if higher_is_better:
+            worse = value < previous * (1 - tolerance)
+        elif name.endswith('lost_flips'):
+            worse = value > previous
+        else:
+            worse = value > previous * (1 + tolerance) and value - previous > 1
+        if worse:
+            regressions.append(f"{name}: {previous:.1f} -> {value:.1f}")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Epoch status monitor against local fake servers")
+    parser.add_argument('--engine', default=DEFAULT_ENGINE,
+                        help=f"Engine coroutine to benchmark as module:function (default {DEFAULT_ENGINE})")
+    parser.add_argument('--seconds', type=float, default=THROUGHPUT_SECONDS, help="Duration of each throughput run")
+    parser.add_argument('--only', choices=['throughput', 'latency'], help="Run only one group of benchmarks")
+    parser.add_argument('--json', help="Write the results to this file")
+    parser.add_argument('--baseline', help="Compare with the results in this file and fail on regressions")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Allowed slowdown against the baseline (0.2 = 20%%)")
+    parser.add_argument('--verbose', action='store_true', help="Show the monitor's own log output")
+    args = parser.parse_args(argv)
+
+    engine = load_engine(args.engine)
+    results = {}
+    output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+
+    print(f"🏁 Benchmarking {args.engine} (JSON decoder for whole documents: {JSON_BACKEND})...")
+    with tempfile.TemporaryDirectory() as workdir, output:
+        if args.only in (None, 'throughput'):
+            results.update(bench_decode())
+            results.update(bench_source_throughput(True, args.seconds))
+            results.update(bench_source_throughput(False, args.seconds))
+            results.update(bench_engine_throughput(engine, args.seconds, workdir))
+            results.update(bench_fetch_cache(engine, args.seconds, workdir))
+            results.update(bench_startup())
+        if args.only in (None, 'latency'):
+            results.update(bench_latency(engine, "clean", workdir))
+            results.update(bench_latency(engine, "faulty", workdir,
+                                         status=Behaviour(latency=0.02, jitter=0.03, error_rate=0.05),
+                                         discord=Behaviour(latency=0.05, jitter=0.05, error_rate=0.1,
+                                                           rate_limit_rate=0.1)))
+
+    width = max(len(name) for name in results)
+    for name, value in results.items():
+        print(f"   {name:<{width}}  {value:10.1f}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Results saved to {args.json}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s) against {args.baseline}:")
+            for regression in regressions:
+                print(f"   - {regression}")
+            return 1
+        print(f"✅ No regressions against {args.baseline}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
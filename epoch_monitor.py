@@ -0,0 +1,13 @@
+#!/usr/bin/env python3
+"""
+Epoch Status Multi-Source Monitor
+Monitors several realms on both status websites from one process.
+Configure the monitors with monitor= lines (or a comma-separated
+status_website_url) in config.txt. Join URLs with '+' in a monitor= line
+to check both sites for each check and combine their answers.
+"""
+
+from epoch_status.app import main
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,12 @@
+"""
+Epoch Status
+Monitors the Project Epoch status websites and sends Discord webhooks when
+realms go up or down. Status websites plug in as source adapters
+(epoch_status.sources); everything else - polling, diffing, state and
+delivery - is shared.
+"""
+
+import time
+
+# When the program started, for the startup time report
+STARTED_AT = time.perf_counter()
@@ -0,0 +1,199 @@
+"""
+Epoch Status Monitor Application
+Builds the configured monitors from the source adapters and runs them.
+Used by the epoch_monitor.py, epoch_webhook.py and epoch_info_webhook.py
+entry points.
+"""
+
+import argparse
+from .config import load_config, print_setup_instructions, ConfigWatcher, MonitorConfig
+from .consensus import ConsensusSource
+from .debounce import Debouncer
+from .engine import Monitor, run_monitors, describe_target, describe_monitor, mark_ready
+from .fetch_cache import create_cache, describe_cache
+from .http_client import set_fetch_cache
+from . import profiling
+from .scheduler import AdaptiveScheduler
+from .sources import SOURCE_CLASSES, get_source
+from .state import state_file_for
+
+def build_monitors(monitor_configs, config, prefix=''):
+    """
+    Create the monitors described by MonitorConfig entries, with the
+    polling, consensus and debouncing settings of config.
+    A source of several URLs joined with '+' becomes a consensus monitor
+    over those sites, the first one being the primary. Monitor names start
+    with prefix, to tell apart the monitors of several deployments.
+
+    Returns:
+        list or None: Monitor objects, None if the configuration is invalid
+    """
+    monitors = []
+    names = set()
+
+    floor, ceiling, stable_period = config.min_check_interval, config.max_check_interval, config.stable_period
+    rule, hedge_delay = config.consensus_rule, config.consensus_hedge_delay
+
+    for entry in monitor_configs:
+        urls = [url.strip() for url in entry.source.split('+')]
+        sources = []
+        for url in urls:
+            source = get_source(url)
+            if source is None:
+                print(f"❌ Error: Unsupported status website {url}")
+                print(f"Supported URLs: {', '.join(SOURCE_CLASSES)}")
+                return None
+            sources.append(source)
+
+        # Realms must exist on every site of a consensus monitor
+        available = [realm for realm in sources[0].realms if all(realm in source.realms for source in sources)]
+        realms = list(entry.realms or available)
+        unknown = [realm for realm in realms if realm not in available]
+        if unknown:
+            print(f"❌ Error: Unknown realm(s) {', '.join(unknown)} for {entry.source}")
+            print(f"Available realms: {', '.join(available)}")
+            return None
+
+        # Give every monitor a unique name for logs and conditional GET state
+        base_name = prefix + '+'.join(source.name for source in sources)
+        name = base_name
+        suffix = 2
+        while name in names:
+            name = f"{base_name}#{suffix}"
+            suffix += 1
+        names.add(name)
+
+        if len(sources) == 1:
+            fetch_status = sources[0].fetch_status
+        else:
+            fetch_status = ConsensusSource([(source.name, source.fetch_status) for source in sources],
+                                           rule=rule, hedge_delay=hedge_delay, name=name)
+            print(f"⚖️  [{name}] Consensus rule: {rule}, hedge delay: {hedge_delay}s")
+
+        interval = entry.interval or min(source.check_interval for source in sources)
+        # A monitor's own interval is its fastest pace; it may still relax up to a higher ceiling
+        monitor_floor = entry.interval or floor
+        monitor_ceiling = max(ceiling, monitor_floor)
+        scheduler = AdaptiveScheduler(monitor_floor, monitor_ceiling, start=interval, stable_period=stable_period,
+                                      name=name)
+        debouncer = Debouncer(realms, **config.debounce)
+        settings = (entry, monitor_floor, monitor_ceiling, stable_period, tuple(config.debounce.items()),
+                    (rule, hedge_delay) if len(sources) > 1 else None)
+        monitors.append(Monitor(entry.source, fetch_status, realms, interval, name=name, scheduler=scheduler,
+                                sources=sources, debouncer=debouncer, settings=settings))
+
+    return monitors
+
+def monitor_configs_for(config, source_url=None):
+    """The monitors to run: one for all realms of source_url if given, else the configured ones"""
+    if source_url:
+        return [MonitorConfig(source_url, None, None)]
+    return config.monitors
+
+def apply_config(group, old, config, source_url=None, prefix=''):
+    """
+    Apply a reloaded configuration to the running monitors.
+    Unchanged monitors keep running untouched. A changed monitor is replaced
+    by a new one that starts from the old one's confirmed statuses, so no
+    transition is missed or announced twice; the old one finishes any check
+    in progress before it stops.
+    """
+    if list(config.targets) != group.targets:
+        group.set_targets(config.targets)
+        print(f"🔃 Webhook targets updated ({len(config.targets)} target(s))")
+        for target in config.targets:
+            describe_target(target)
+    group.delivery.coalesce_window = config.coalesce_window
+
+    monitors = build_monitors(monitor_configs_for(config, source_url), config, prefix)
+    if not monitors:
+        print("⚠️  Keeping the running monitors, the new monitor configuration is invalid")
+        return
+
+    running = {monitor.name: monitor for monitor in group.monitors}
+    for monitor in monitors:
+        current = running.pop(monitor.name, None)
+        if current is not None and current.settings == monitor.settings:
+            continue
+
+        if current is not None:
+            if current.previous and set(current.previous) == set(monitor.realms):
+                monitor.previous = dict(current.previous)
+                monitor.debouncer.seed(current.previous)
+            group.retire(current)
+            print(f"🔃 [{monitor.name}] Settings changed, restarting the monitor")
+        group.start(monitor)
+        describe_monitor(monitor)
+
+    for monitor in running.values():
+        group.retire(monitor)
+        print(f"🔃 [{monitor.name}] No longer configured, stopped watching")
+
+    if (config.metrics_port, config.metrics_host) != (old.metrics_port, old.metrics_host):
+        print("⚠️  Metrics endpoint changes take effect after a restart")
+
+def apply_cache_config(old, config):
+    """Switch to a new fetch cache if its settings changed"""
+    if config.cache != old.cache:
+        set_fetch_cache(create_cache(**config.cache))
+        print(describe_cache(**config.cache))
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Monitor the Epoch server status and notify Discord")
+    parser.add_argument('--profile', action='store_true',
+                        help="Time every phase of each check; summary on exit or SIGUSR1")
+    parser.add_argument('--profile-cycles', type=int, default=0, metavar='N',
+                        help=f"Also run the first N checks under cProfile (saved to {profiling.PROFILE_FILE})")
+    return parser.parse_args(argv)
+
+def main(source_url=None, argv=None):
+    """
+    Run the monitors until Ctrl+C.
+
+    Args:
+        source_url (str): Monitor only this status website for all realms,
+            ignoring monitor= lines (used by the single-site scripts)
+        argv (list): Command line arguments, sys.argv if omitted
+    """
+    mark_ready()
+    args = parse_args(argv)
+    if source_url:
+        print("🚀 Epoch Status Webhook Monitor Starting...")
+    else:
+        print("🚀 Epoch Status Multi-Source Monitor Starting...")
+    print("=" * 50)
+
+    if args.profile or args.profile_cycles > 0:
+        profiling.enable(cprofile_cycles=max(args.profile_cycles, 0))
+
+    # Check if configuration is set up
+    config = load_config()
+    if config is None:
+        print_setup_instructions()
+        input("\nPress Enter to exit...")
+        return
+
+    monitors = build_monitors(monitor_configs_for(config, source_url), config)
+    if not monitors:
+        if monitors is not None:
+            print("❌ Error: No monitors configured. Set status_website_url or add monitor= lines to config.txt")
+        input("\nPress Enter to exit...")
+        return
+
+    print(f"✅ {len(config.targets)} webhook target(s) loaded successfully")
+    print(f"⏱️  Check interval: {config.min_check_interval}-{config.max_check_interval} seconds")
+    print(f"🔁 Confirming changes after {config.confirm_down_checks} DOWN / {config.confirm_up_checks} UP check(s)")
+    set_fetch_cache(create_cache(**config.cache))
+    print(describe_cache(**config.cache))
+    print("🔃 Changes to config.txt are applied while running")
+
+    def watch_config(group):
+        def on_change(old, new):
+            apply_config(group, old, new, source_url)
+            apply_cache_config(old, new)
+        return ConfigWatcher(config, on_change).run()
+
+    state_file = state_file_for(get_source(source_url).name if source_url else None)
+    run_monitors(monitors, list(config.targets), coalesce_window=config.coalesce_window,
+                 metrics_port=config.metrics_port, metrics_host=config.metrics_host, watchers=[watch_config],
+                 state_file=state_file)
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Epoch Status Monitor Configuration
+Reads config.txt once into an immutable, validated Config, and watches the
+file so changes are picked up without restarting the monitor.
+"""
+
+import asyncio
+import os
+from collections import namedtuple
+from .delivery import WebhookTarget, COALESCE_WINDOW
+from .scheduler import MIN_CHECK_INTERVAL, MAX_CHECK_INTERVAL, STABLE_PERIOD
+from .consensus import CONSENSUS_RULES, DEFAULT_RULE, HEDGE_DELAY
+from .metrics import METRICS_HOST
+from .fetch_cache import CACHE_KINDS, DEFAULT_CACHE, CACHE_TTL, CACHE_DIR, CACHE_PORT
+from .debounce import CONFIRM_DOWN_CHECKS, CONFIRM_UP_CHECKS, FLAP_WINDOW, FLAP_THRESHOLD, SETTLE_CHECKS
+
+# Configuration
+CONFIG_FILE = 'config.txt'
+CONFIG_CHECK_INTERVAL = 5  # seconds between checks of config.txt for changes
+MULTI_KEYS = ('target', 'monitor')  # keys that may appear on several lines
+
+# One monitor= line: realms is a tuple (None for all realms), interval is None for the default
+MonitorConfig = namedtuple('MonitorConfig', ['source', 'realms', 'interval'])
+
+class Config(namedtuple('Config', [
+        'targets', 'monitors', 'status_website_url',
+        'min_check_interval', 'max_check_interval', 'stable_period',
+        'consensus_rule', 'consensus_hedge_delay',
+        'confirm_down_checks', 'confirm_up_checks', 'flap_window', 'flap_threshold', 'settle_checks',
+        'coalesce_window', 'metrics_port', 'metrics_host',
+        'fetch_cache', 'fetch_cache_ttl', 'fetch_cache_dir', 'fetch_cache_port'])):
+    """
+    Everything config.txt configures, validated. Immutable, so a reload
+    builds a new Config and nothing holding the old one sees a half-applied
+    change.
+    """
+
+    __slots__ = ()
+
+    @property
+    def debounce(self):
+        """Keyword arguments for Debouncer"""
+        return {"confirm_down": self.confirm_down_checks, "confirm_up": self.confirm_up_checks,
+                "flap_window": self.flap_window, "flap_threshold": self.flap_threshold,
+                "settle": self.settle_checks}
+
+    @property
+    def cache(self):
+        """Keyword arguments for create_cache"""
+        return {"kind": self.fetch_cache, "ttl": self.fetch_cache_ttl,
+                "directory": self.fetch_cache_dir, "port": self.fetch_cache_port}
+
+def validate_target(webhook_url, role_id, label):
+    """
+    Validate one webhook URL and role ID.
+
+    Returns:
+        tuple: (webhook_url, role_id), webhook_url is None if it is invalid
+    """
+    if not webhook_url.startswith('https://discord.com/api/webhooks/'):
+        print(f"❌ Error: Invalid Discord webhook URL for {label} in {CONFIG_FILE}")
+        print("URL should start with: https://discord.com/api/webhooks/")
+        return None, None
+
+    # Validate role ID (optional)
+    if role_id and not role_id.isdigit():
+        print(f"⚠️  Warning: Invalid role ID for {label} in {CONFIG_FILE}! Should be numbers only. Role mentions will be disabled.")
+        role_id = None
+
+    if not role_id:
+        print(f"⚠️  Warning: role_id is empty for {label} in {CONFIG_FILE}. Role mentions will be disabled.")
+
+    return webhook_url, role_id or None
+
+def read_settings(path=CONFIG_FILE):
+    """
+    Read the key=value lines of config.txt.
+
+    Returns:
+        dict: key -> value; target and monitor map to a list of values
+    """
+    settings = {key: [] for key in MULTI_KEYS}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            key, separator, value = line.strip().partition('=')
+            if not separator or key.startswith('#'):
+                continue
+            key, value = key.strip(), value.strip()
+            if key in MULTI_KEYS:
+                settings[key].append(value)
+            else:
+                settings[key] = value
+    return settings
+
+def parse_number(settings, key, default, minimum=1, maximum=None, kind=int):
+    """Get a numeric setting, warning and using the default if it is invalid"""
+    value = settings.get(key, '')
+    if not value:
+        return default
+    try:
+        number = kind(value)
+        if number < minimum or (maximum is not None and number > maximum):
+            raise ValueError(value)
+        return number
+    except ValueError:
+        print(f"⚠️  Warning: Invalid {key} '{value}' in {CONFIG_FILE}, using {default}.")
+        return default
+
+def parse_targets(settings):
+    """
+    The webhook_url/role_id pair is the default target. More targets can be
+    added with lines of the form
+        target=<webhook_url>|<role_id>|<realm>,<realm>
+    where the role ID and realm filter are optional.
+
+    Returns:
+        tuple or None: WebhookTarget objects, None if the configuration is invalid
+    """
+    webhook_url = settings.get('webhook_url', '')
+    extra_targets = [[part.strip() for part in value.split('|')] for value in settings['target']]
+
+    # Validate webhook URL
+    if not webhook_url and not extra_targets:
+        print(f"❌ Error: webhook_url is empty in {CONFIG_FILE}!")
+        return None
+
+    targets = []
+    if webhook_url:
+        webhook_url, role_id = validate_target(webhook_url, settings.get('role_id', ''), "webhook_url")
+        if not webhook_url:
+            return None
+        targets.append(WebhookTarget(webhook_url, role_id))
+
+    for index, parts in enumerate(extra_targets, 1):
+        target_role_id = parts[1] if len(parts) > 1 else ''
+        target_url, target_role_id = validate_target(parts[0], target_role_id, f"target #{index}")
+        if not target_url:
+            return None
+
+        realms = None
+        if len(parts) > 2 and parts[2]:
+            realms = [realm.strip() for realm in parts[2].split(',') if realm.strip()]
+        targets.append(WebhookTarget(target_url, target_role_id, realms))
+
+    return tuple(targets)
+
+def parse_monitors(settings):
+    """
+    Each monitor is a line of the form
+        monitor=<status_website_url>|<realm>,<realm>|<interval seconds>
+    where the realm list and interval are optional. An interval replaces
+    min_check_interval for that monitor, and raises its max_check_interval
+    if it is higher. Without any monitor lines,
+    every URL in status_website_url (comma-separated) is monitored for all realms.
+
+    Returns:
+        tuple: MonitorConfig objects
+    """
+    monitors = []
+    for value in settings['monitor']:
+        parts = [part.strip() for part in value.split('|')]
+        realms = None
+        interval = None
+
+        if len(parts) > 1 and parts[1]:
+            realms = tuple(realm.strip() for realm in parts[1].split(',') if realm.strip())
+        if len(parts) > 2 and parts[2]:
+            if parts[2].isdigit() and int(parts[2]) > 0:
+                interval = int(parts[2])
+            else:
+                print(f"⚠️  Warning: Invalid interval '{parts[2]}' for monitor {parts[0]}, using the default.")
+
+        monitors.append(MonitorConfig(parts[0], realms, interval))
+
+    if not monitors:
+        for url in settings.get('status_website_url', '').split(','):
+            if url.strip():
+                monitors.append(MonitorConfig(url.strip(), None, None))
+
+    return tuple(monitors)
+
+def load_config(path=CONFIG_FILE):
+    """
+    Read and validate config.txt.
+
+    Optional settings (defaults in brackets):
+        min_check_interval / max_check_interval - adaptive polling bounds in
+            seconds, the same value for a fixed interval [10 / 30]
+        stable_period - seconds without a change or error before the
+            interval relaxes toward max_check_interval [900]
+        consensus_rule / consensus_hedge_delay - how consensus monitors combine
+            their sources [first-wins / 2]
+        confirm_down_checks / confirm_up_checks - consecutive checks before a
+            change is announced [2 / 2]
+        flap_window / flap_threshold / settle_checks - flips within that many
+            checks that mark a realm unstable (0 disables), identical checks
+            that end it [10 / 4 / 5]
+        coalesce_window - seconds to gather messages into one post [0, off]
+        metrics_port / metrics_host - metrics endpoint, off without a port
+        fetch_cache / fetch_cache_ttl - how monitors of the same site share
+            its responses: off, memory, disk or socket, and for how many
+            seconds [off / 5]
+        fetch_cache_dir / fetch_cache_port - where the disk and socket caches
+            live [.fetch-cache / 8787]
+
+    Returns:
+        Config or None: None if the file is missing or has no valid webhook
+    """
+    try:
+        if not os.path.exists(path):
+            print(f"❌ Error: {CONFIG_FILE} not found!")
+            print(f"Please create {CONFIG_FILE} and configure your webhook URL and role ID.")
+            return None
+        settings = read_settings(path)
+    except Exception as e:
+        print(f"❌ Error reading {CONFIG_FILE}: {e}")
+        return None
+
+    targets = parse_targets(settings)
+    if targets is None:
+        return None
+
+    floor = parse_number(settings, 'min_check_interval', MIN_CHECK_INTERVAL)
+    ceiling = parse_number(settings, 'max_check_interval', MAX_CHECK_INTERVAL)
+    if ceiling < floor:
+        print(f"⚠️  Warning: max_check_interval is below min_check_interval in {CONFIG_FILE}, using {floor} for both.")
+        ceiling = floor
+
+    rule = settings.get('consensus_rule') or DEFAULT_RULE
+    if rule not in CONSENSUS_RULES:
+        print(f"⚠️  Warning: Invalid consensus_rule '{rule}' in {CONFIG_FILE}, using {DEFAULT_RULE}. "
+              f"Options: {', '.join(CONSENSUS_RULES)}")
+        rule = DEFAULT_RULE
+
+    metrics_port = settings.get('metrics_port') or None
+    if metrics_port:
+        if metrics_port.isdigit() and 0 < int(metrics_port) < 65536:
+            metrics_port = int(metrics_port)
+        else:
+            print(f"⚠️  Warning: Invalid metrics_port '{metrics_port}' in {CONFIG_FILE}, metrics endpoint disabled.")
+            metrics_port = None
+
+    cache = settings.get('fetch_cache') or DEFAULT_CACHE
+    if cache not in CACHE_KINDS:
+        print(f"⚠️  Warning: Invalid fetch_cache '{cache}' in {CONFIG_FILE}, using {DEFAULT_CACHE}. "
+              f"Options: {', '.join(CACHE_KINDS)}")
+        cache = DEFAULT_CACHE
+
+    return Config(
+        targets=targets,
+        monitors=parse_monitors(settings),
+        status_website_url=settings.get('status_website_url', ''),
+        min_check_interval=floor,
+        max_check_interval=ceiling,
+        stable_period=parse_number(settings, 'stable_period', STABLE_PERIOD, 0),
+        consensus_rule=rule,
+        consensus_hedge_delay=parse_number(settings, 'consensus_hedge_delay', HEDGE_DELAY, 0, kind=float),
+        confirm_down_checks=parse_number(settings, 'confirm_down_checks', CONFIRM_DOWN_CHECKS),
+        confirm_up_checks=parse_number(settings, 'confirm_up_checks', CONFIRM_UP_CHECKS),
+        flap_window=parse_number(settings, 'flap_window', FLAP_WINDOW),
+        flap_threshold=parse_number(settings, 'flap_threshold', FLAP_THRESHOLD, 0),
+        settle_checks=parse_number(settings, 'settle_checks', SETTLE_CHECKS),
+        coalesce_window=parse_number(settings, 'coalesce_window', COALESCE_WINDOW, 0, kind=float),
+        metrics_port=metrics_port,
+        metrics_host=settings.get('metrics_host') or METRICS_HOST,
+        fetch_cache=cache,
+        fetch_cache_ttl=parse_number(settings, 'fetch_cache_ttl', CACHE_TTL, 0, kind=float),
+        fetch_cache_dir=settings.get('fetch_cache_dir') or CACHE_DIR,
+        fetch_cache_port=parse_number(settings, 'fetch_cache_port', CACHE_PORT, 1, 65535),
+    )
+
+def config_stamp(path=CONFIG_FILE):
+    """Modification time and size of config.txt, None if it is missing"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+class ConfigWatcher:
+    """
+    Reloads config.txt when its modification time or size changes and hands
+    the new Config to on_change(old, new) on the event loop. An invalid file
+    is reported and ignored, so the running configuration stays in place.
+    """
+
+    def __init__(self, config, on_change, path=CONFIG_FILE, interval=CONFIG_CHECK_INTERVAL):
+        self.config = config
+        self.on_change = on_change
+        self.path = path
+        self.interval = interval
+        self.stamp = config_stamp(path)
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            stamp = config_stamp(self.path)
+            if stamp is None or stamp == self.stamp:
+                continue
+            self.stamp = stamp
+
+            print(f"🔃 {self.path} changed, reloading...")
+            config = await asyncio.to_thread(load_config, self.path)
+            if config is None:
+                print(f"⚠️  Keeping the previous configuration until {self.path} is fixed")
+                continue
+            if config == self.config:
+                print("🔃 No effective changes")
+                continue
+
+            old, self.config = self.config, config
+            try:
+                self.on_change(old, config)
+            except Exception as e:
+                print(f"❌ Error applying the new configuration: {e}")
+
+def print_setup_instructions():
+    """Print how to create config.txt"""
+    print("\n📝 Setup Instructions:")
+    print(f"1. Create a file named '{CONFIG_FILE}' in this directory")
+    print("2. Add your Discord webhook URL and role ID in this format:")
+    print("   webhook_url=https://discord.com/api/webhooks/YOUR_WEBHOOK_ID/YOUR_WEBHOOK_TOKEN")
+    print("   role_id=1234567890123456789")
+    print("   Add target=<webhook_url>|<role_id>|<realm>,<realm> lines to notify more channels")
+    print("3. Run this script again")
+    print("\n💡 To get a Discord webhook URL:")
+    print("   - Go to your Discord server")
+    print("   - Edit a channel → Integrations → Webhooks")
+    print("   - Create a new webhook and copy the URL")
+    print("\n💡 To get a Discord role ID (optional):")
+    print("   - Enable Developer Mode in Discord")
+    print("   - Right-click on the role and copy ID")
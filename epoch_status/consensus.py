@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Epoch Status Multi-Source Consensus
+Combines several status sources into one fetch_status() for a monitor.
+The primary source is asked first; the next one is only asked if the primary
+has not answered within the hedge delay (or failed), or when the rule needs a
+second opinion. Results are combined per realm with a configurable rule:
+
+- first-wins: the first source to answer decides
+- agreement-required: a realm only changes status when every answering source agrees
+- any-down: a realm is DOWN if any source says so (always asks every source)
+"""
+
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from . import metrics
+
+# Configuration
+CONSENSUS_RULES = ('first-wins', 'agreement-required', 'any-down')
+DEFAULT_RULE = 'first-wins'
+HEDGE_DELAY = 2.0  # seconds to wait for the primary before asking the next source
+
+class ConsensusSource:
+    """
+    A fetch_status(realms, cache_key=...) callable backed by several sources.
+
+    Args:
+        sources (list): (name, fetch_status) pairs, primary first
+        rule (str): One of CONSENSUS_RULES
+        hedge_delay (float): Seconds before the next source is asked as well
+        name (str): The monitor's name, for logs and metrics
+    """
+
+    def __init__(self, sources, rule=DEFAULT_RULE, hedge_delay=HEDGE_DELAY, name=None):
+        if rule not in CONSENSUS_RULES:
+            raise ValueError(f"Unknown consensus rule {rule!r}, use one of {', '.join(CONSENSUS_RULES)}")
+        self.sources = list(sources)
+        self.name = name or '+'.join(source_name for source_name, _ in self.sources)
+        self.rule = rule
+        self.hedge_delay = hedge_delay
+        self.executor = ThreadPoolExecutor(max_workers=len(self.sources), thread_name_prefix='consensus')
+        self.last_results = {}  # source index -> last statuses it returned
+        self.last_combined = None
+        self.stats = {"checks": 0, "hedged": 0, "primary_wins": 0, "fallback_wins": 0, "disagreements": 0}
+
+    def count(self, event):
+        self.stats[event] += 1
+        metrics.CONSENSUS_EVENTS.inc(monitor=self.name, event=event)
+
+    def format_stats(self):
+        """Get how the sources were used, for log output"""
+        stats = self.stats
+        return (f"⚖️  [{self.name}] Consensus - checks: {stats['checks']}, hedged: {stats['hedged']}, "
+                f"primary won: {stats['primary_wins']}, fallback won: {stats['fallback_wins']}, "
+                f"disagreements: {stats['disagreements']}")
+
+    def close(self):
+        """Print the stats and let the worker threads exit once idle; no checks may follow"""
+        print(self.format_stats())
+        self.executor.shutdown(wait=False)
+
+    def fetch_one(self, index, realms, cache_key):
+        """Fetch one source; an unchanged response reuses its last result"""
+        name, fetch_status = self.sources[index]
+        statuses = fetch_status(realms, cache_key=f"{cache_key}/{name}")
+        if statuses is None:
+            statuses = self.last_results.get(index)
+            if statuses is None:
+                # Unchanged but never seen (e.g. shared validators): nothing to use
+                statuses = {realm: None for realm in realms}
+        self.last_results[index] = statuses
+        return statuses
+
+    def __call__(self, realms, cache_key=None):
+        self.count("checks")
+        futures = {}
+
+        def start(index):
+            # Run in a copy of this thread's context, so the source's phases land in the check's profile
+            context = contextvars.copy_context()
+            futures[self.executor.submit(context.run, self.fetch_one, index, realms, cache_key)] = index
+
+        if self.rule == 'any-down':
+            for index in range(len(self.sources)):
+                start(index)
+        else:
+            start(0)
+            done, _ = wait(futures, timeout=self.hedge_delay)
+            primary = next(iter(futures))
+            if not done or primary.exception() is not None:
+                # The primary is slow or failed: hedge with the other sources
+                self.count("hedged")
+                for index in range(1, len(self.sources)):
+                    start(index)
+
+        if self.rule == 'first-wins':
+            combined = self.first_result(futures)
+        else:
+            if self.rule == 'agreement-required' and len(futures) == 1:
+                primary_result = self.result_of(next(iter(futures)))
+                if primary_result is not None and primary_result == self.last_combined:
+                    # Nothing changed according to the primary, no need for a second opinion
+                    return primary_result
+                for index in range(1, len(self.sources)):
+                    start(index)
+
+            results = self.all_results(futures)
+            combined = self.combine(realms, results)
+
+        self.last_combined = combined
+        return combined
+
+    def result_of(self, future):
+        try:
+            return future.result()
+        except Exception:
+            return None
+
+    def first_result(self, futures):
+        """Get the first successful result, in completion order"""
+        pending = set(futures)
+        first_error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in sorted(done, key=lambda future: futures[future]):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    first_error = first_error or e
+                    continue
+                self.count("primary_wins" if futures[future] == 0 else "fallback_wins")
+                return result
+        raise first_error
+
+    def all_results(self, futures):
+        """Wait for every source; fail only if all of them failed"""
+        wait(futures)
+        results = []
+        errors = []
+        for future in sorted(futures, key=lambda future: futures[future]):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                errors.append(e)
+        if not results:
+            raise errors[0]
+        return results
+
+    def combine(self, realms, results):
+        """Combine several realm -> status dicts with the configured rule"""
+        combined = {}
+        for realm in realms:
+            values = [result.get(realm) for result in results if result.get(realm) is not None]
+            if not values:
+                combined[realm] = None
+            elif self.rule == 'any-down':
+                combined[realm] = "DOWN" if "DOWN" in values else "UP"
+            elif len(set(values)) == 1:
+                combined[realm] = values[0]
+            else:
+                # Sources disagree: keep the last agreed status until they agree again
+                self.count("disagreements")
+                last = (self.last_combined or {}).get(realm)
+                combined[realm] = last if last is not None else values[0]
+                print(f"⚖️  Sources disagree on {realm} ({', '.join(values)}), keeping {combined[realm]}")
+        return combined
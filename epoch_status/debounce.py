@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Epoch Status Transition Debouncing
+Sits between the raw check results and the notifications. A realm has to
+report a new status on several consecutive checks before the change is
+announced, and a realm that keeps flipping is announced once as unstable
+instead of on every flip, so the number of messages stays bounded however
+noisy the upstream is.
+"""
+
+from collections import deque
+
+# Configuration
+CONFIRM_DOWN_CHECKS = 2  # consecutive DOWN samples before a realm is announced DOWN
+CONFIRM_UP_CHECKS = 2  # consecutive UP samples before a realm is announced UP
+FLAP_WINDOW = 10  # number of recent samples inspected for flapping
+FLAP_THRESHOLD = 4  # status flips within the window that mark a realm unstable
+SETTLE_CHECKS = 5  # identical consecutive samples that end an unstable period
+
+# Events returned by RealmDebouncer.update()
+CONFIRMED = "confirmed"
+UNSTABLE = "unstable"
+SETTLED = "settled"
+
+class RealmDebouncer:
+    """
+    State machine for one realm.
+
+    The confirmed status only changes once the new status has been seen
+    confirm_down/confirm_up times in a row. When the last flap_window samples
+    contain flap_threshold or more flips the realm becomes unstable: the
+    confirmed status is frozen until settle identical samples in a row, at
+    which point it takes that status.
+    """
+
+    def __init__(self, confirmed=None, confirm_down=CONFIRM_DOWN_CHECKS, confirm_up=CONFIRM_UP_CHECKS,
+                 flap_window=FLAP_WINDOW, flap_threshold=FLAP_THRESHOLD, settle=SETTLE_CHECKS):
+        self.confirmed = confirmed
+        self.confirm_down = max(confirm_down, 1)
+        self.confirm_up = max(confirm_up, 1)
+        self.flap_threshold = flap_threshold
+        self.settle = max(settle, 1)
+        self.unstable = False
+        self.candidate = None  # status of the current run of identical samples
+        self.streak = 0
+        self.samples = deque(maxlen=max(flap_window, 2))
+
+    def flips(self):
+        """Number of status flips in the recent samples"""
+        samples = list(self.samples)
+        return sum(1 for before, after in zip(samples, samples[1:]) if before != after)
+
+    def update(self, sample):
+        """
+        Feed one sample.
+
+        Args:
+            sample (str): "UP" or "DOWN"; None (unparseable) is ignored
+
+        Returns:
+            str or None: CONFIRMED, UNSTABLE or SETTLED, None if nothing
+            should be announced
+        """
+        if sample is None:
+            return None
+
+        self.samples.append(sample)
+        if sample == self.candidate:
+            self.streak += 1
+        else:
+            self.candidate = sample
+            self.streak = 1
+
+        # The first sample is the baseline, nothing to announce yet
+        if self.confirmed is None:
+            self.confirmed = sample
+            return None
+
+        if self.unstable:
+            if self.streak < self.settle:
+                return None
+            self.unstable = False
+            self.confirmed = sample
+            # Start a fresh window so the old flips do not count again
+            self.samples.clear()
+            self.samples.append(sample)
+            return SETTLED
+
+        if self.flap_threshold and self.flips() >= self.flap_threshold:
+            self.unstable = True
+            return UNSTABLE
+
+        required = self.confirm_down if sample == "DOWN" else self.confirm_up
+        if sample != self.confirmed and self.streak >= required:
+            self.confirmed = sample
+            return CONFIRMED
+        return None
+
+class Debouncer:
+    """RealmDebouncer for every realm of a monitor"""
+
+    def __init__(self, realms, **settings):
+        self.settings = settings
+        self.realms = {realm: RealmDebouncer(**settings) for realm in realms}
+
+    def seed(self, statuses):
+        """Start from previously confirmed statuses, e.g. restored from state.json"""
+        for realm, status in statuses.items():
+            if realm in self.realms:
+                self.realms[realm] = RealmDebouncer(confirmed=status, **self.settings)
+
+    @property
+    def confirmed(self):
+        """realm -> confirmed status, None until every realm has a baseline"""
+        statuses = {realm: debouncer.confirmed for realm, debouncer in self.realms.items()}
+        if any(status is None for status in statuses.values()):
+            return None
+        return statuses
+
+    @property
+    def unstable(self):
+        return [realm for realm, debouncer in self.realms.items() if debouncer.unstable]
+
+    def update(self, statuses):
+        """
+        Feed one check's raw statuses.
+
+        Returns:
+            dict: realm -> event for the realms that produced one
+        """
+        events = {}
+        for realm, debouncer in self.realms.items():
+            event = debouncer.update(statuses.get(realm))
+            if event:
+                events[realm] = event
+        return events
+
+def replay(samples, **settings):
+    """
+    Run a recorded sample sequence for one realm through a RealmDebouncer,
+    e.g. replay(["UP", "DOWN", "DOWN", "UP"], confirm_down=2).
+
+    Returns:
+        list: (index, event, confirmed status) for every sample that produced an event
+    """
+    debouncer = RealmDebouncer(**settings)
+    events = []
+    for index, sample in enumerate(samples):
+        event = debouncer.update(sample)
+        if event:
+            events.append((index, event, debouncer.confirmed))
+    return events
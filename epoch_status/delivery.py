@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""
+Epoch Status Discord Delivery
+Builds the status embeds and posts them to any number of Discord webhooks
+from bounded queues drained in the background, so a Discord outage never
+stalls polling.
+"""
+
+import asyncio
+import random
+import time
+import requests
+from datetime import datetime
+import traceback
+from .http_client import get_client
+from . import metrics, profiling
+
+# Configuration
+QUEUE_SIZE = 100  # messages waiting for delivery before new ones are dropped
+MAX_RETRIES = 5
+BACKOFF_BASE = 2  # seconds, doubled after every failed attempt
+BACKOFF_MAX = 60  # seconds
+MAX_RATE_LIMITED = 5  # 429 responses tolerated per message on top of MAX_RETRIES
+DEFAULT_RATE_LIMIT = 5  # requests per window until Discord tells us the real bucket
+DEFAULT_RATE_WINDOW = 2  # seconds
+GLOBAL_RATE_LIMIT = 50  # requests per second across all webhooks
+COALESCE_WINDOW = 0  # seconds to gather messages for one webhook into a single post (0: send right away)
+MAX_EMBEDS = 10  # embeds Discord accepts in one message
+
+def build_embed(message, color=0x00ff00):
+    """Build the Discord embed for one status message"""
+    return {
+        "title": "🚀 Epoch Status Update",
+        "description": message,
+        "color": color,
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "footer": {
+            "text": "Epoch Status Monitor",
+            "icon_url": "https://cdn.discordapp.com/embed/avatars/0.png"
+        }
+    }
+
+def build_batch_payload(entries, username="Epoch Status Bot", color=0x00ff00):
+    """
+    Build one Discord webhook payload carrying several status messages,
+    one embed each.
+
+    Args:
+        entries (list): (message, role_id) pairs, at most MAX_EMBEDS
+
+    Returns:
+        dict: The webhook payload
+    """
+    payload = {
+        "username": username,
+        "embeds": [build_embed(message, color) for message, _ in entries]
+    }
+
+    # Add role mentions if role IDs are available, once per role
+    role_ids = []
+    for message, role_id in entries:
+        if role_id and "DOWN" not in message and role_id not in role_ids:
+            role_ids.append(role_id)
+    if role_ids:
+        payload["content"] = ' '.join(f"<@&{role_id}>" for role_id in role_ids)
+
+    return payload
+
+def post_webhook(webhook_url, payload):
+    """
+    Make one blocking delivery attempt.
+    Returns the response for 2xx and 429, raises RequestException otherwise.
+    """
+    response = get_client().post(webhook_url, json=payload)
+    if response.status_code != 429:
+        response.raise_for_status()
+    return response
+
+def get_retry_after(response):
+    """Get the seconds to wait from a 429 response body or Retry-After header"""
+    try:
+        return float(response.json()["retry_after"])
+    except (ValueError, KeyError, TypeError):
+        pass
+    try:
+        return float(response.headers.get('Retry-After', DEFAULT_RATE_WINDOW))
+    except ValueError:
+        return DEFAULT_RATE_WINDOW
+
+def backoff_delay(attempt):
+    """Exponential backoff with full jitter for the given (0-based) failed attempt"""
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+class RateLimitBucket:
+    """
+    Token bucket for one Discord webhook.
+    Starts from a conservative default and then follows the X-RateLimit-*
+    headers Discord returns, so sends are paced before they get rejected.
+    """
+
+    def __init__(self, limit=DEFAULT_RATE_LIMIT, window=DEFAULT_RATE_WINDOW, clock=time.monotonic):
+        self.limit = limit
+        self.window = window
+        self.clock = clock
+        self.remaining = limit
+        self.reset_at = 0.0
+
+    def delay(self):
+        """Seconds to wait before the next send is allowed (0 if it can go now)"""
+        now = self.clock()
+        if now >= self.reset_at and self.remaining <= 0:
+            # The window has passed, so the bucket is full again
+            self.remaining = self.limit
+            self.reset_at = now + self.window
+        if self.remaining > 0:
+            return 0
+        return self.reset_at - now
+
+    def consume(self):
+        """Take a token for a send that is about to happen"""
+        if self.remaining == self.limit:
+            self.reset_at = max(self.reset_at, self.clock() + self.window)
+        self.remaining -= 1
+
+    async def acquire(self):
+        """Wait until a send is allowed, then take a token"""
+        while True:
+            delay = self.delay()
+            if delay <= 0:
+                self.consume()
+                return
+            await asyncio.sleep(delay)
+
+    def update(self, headers):
+        """Adopt the bucket state Discord reported in the response headers"""
+        now = self.clock()
+        try:
+            if 'X-RateLimit-Limit' in headers:
+                self.limit = int(headers['X-RateLimit-Limit'])
+            if 'X-RateLimit-Remaining' in headers:
+                self.remaining = int(headers['X-RateLimit-Remaining'])
+            if 'X-RateLimit-Reset-After' in headers:
+                self.reset_at = now + float(headers['X-RateLimit-Reset-After'])
+        except ValueError:
+            pass
+
+    def block(self, seconds):
+        """Stop all sends for the given number of seconds (after a 429)"""
+        self.remaining = 0
+        self.reset_at = max(self.reset_at, self.clock() + seconds)
+
+class WebhookTarget:
+    """A Discord webhook to notify, with its own role mention and realm filter"""
+
+    def __init__(self, webhook_url, role_id=None, realms=None):
+        self.webhook_url = webhook_url
+        self.role_id = role_id
+        self.realms = tuple(realms) if realms is not None else None  # None means every realm
+        # Only the webhook ID goes into logs, never the token
+        self.name = f"webhook {webhook_url.rstrip('/').split('/')[-2]}"
+
+    def key(self):
+        return self.webhook_url, self.role_id, self.realms
+
+    def __eq__(self, other):
+        return isinstance(other, WebhookTarget) and self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def filter_realms(self, realms):
+        """Get the realms from the given list this target wants to hear about"""
+        return [realm for realm in realms if self.realms is None or realm in self.realms]
+
+class DeliveryQueue:
+    """
+    Bounded in-memory queues of webhook messages, one per webhook URL.
+    Each queue is drained by its own background worker on the event loop,
+    so targets are delivered to concurrently and a slow or rate-limited
+    webhook never holds up the others. Messages for the same webhook that
+    arrive within coalesce_window seconds of the first one are sent together
+    as a single post with one embed each.
+    """
+
+    def __init__(self, maxsize=QUEUE_SIZE, store=None, coalesce_window=COALESCE_WINDOW):
+        self.maxsize = maxsize
+        self.coalesce_window = coalesce_window
+        self.store = store  # optional StateStore keeping undelivered messages
+        self.queues = {}  # webhook URL -> asyncio.Queue
+        self.workers = {}  # webhook URL -> worker task
+        self.summaries = set()  # pending fan-out summary tasks
+        self.target_stats = {}  # target name -> {"sent": n, "failed": n}
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+        self.last_latency = None
+        self.max_latency = 0.0
+        self.rate_limited = 0
+        self.posts = 0  # webhook posts made, each carrying one or more messages
+        self.buckets = {}  # webhook URL -> RateLimitBucket
+        self.global_bucket = RateLimitBucket(limit=GLOBAL_RATE_LIMIT, window=1)
+
+    def get_bucket(self, webhook_url):
+        """Get the rate-limit bucket for a webhook, creating it on first use"""
+        if webhook_url not in self.buckets:
+            self.buckets[webhook_url] = RateLimitBucket()
+        return self.buckets[webhook_url]
+
+    def get_queue(self, webhook_url):
+        """Get the queue for a webhook, starting its worker on first use"""
+        if webhook_url not in self.queues:
+            self.queues[webhook_url] = asyncio.Queue(self.maxsize)
+            self.workers[webhook_url] = asyncio.get_running_loop().create_task(self.run(webhook_url))
+        return self.queues[webhook_url]
+
+    def submit(self, message, target):
+        """
+        Queue a message for one target without waiting for it to be sent.
+
+        Returns:
+            asyncio.Future or None: Resolves to True/False once delivery finishes,
+            None if the queue is full and the message was dropped
+        """
+        future = asyncio.get_running_loop().create_future()
+        try:
+            queue = self.get_queue(target.webhook_url)
+            if queue.full():
+                raise asyncio.QueueFull
+            pending_id = None
+            if self.store:
+                pending_id = self.store.add_pending(message, target.webhook_url, target.role_id)
+            queue.put_nowait((time.monotonic(), message, target, future, pending_id))
+            return future
+        except asyncio.QueueFull:
+            self.dropped += 1
+            self.count_result(target, False)
+            metrics.WEBHOOK_MESSAGES.inc(webhook=target.name, result="dropped")
+            print(f"⚠️  Delivery queue for {target.name} full ({self.maxsize}), dropping message: {message}")
+            return None
+
+    def submit_all(self, deliveries):
+        """
+        Queue messages for several targets at once and log a per-target
+        summary when they have all finished.
+
+        Args:
+            deliveries (list): (target, message) pairs
+        """
+        pending = [(target, self.submit(message, target)) for target, message in deliveries]
+        if len(pending) > 1:
+            task = asyncio.get_running_loop().create_task(self.summarize(pending))
+            self.summaries.add(task)
+            task.add_done_callback(self.summaries.discard)
+
+    async def summarize(self, pending):
+        """Wait for one fan-out to finish and print which targets got it"""
+        results = []
+        for target, future in pending:
+            delivered = await future if future is not None else False
+            results.append(f"{target.name} {'✅' if delivered else '❌'}")
+
+        delivered_count = sum(1 for result in results if result.endswith('✅'))
+        print(f"📬 Delivered to {delivered_count}/{len(results)} targets: {', '.join(results)}")
+
+    def count_result(self, target, delivered):
+        """Count a finished delivery for the per-target summary"""
+        stats = self.target_stats.setdefault(target.name, {"sent": 0, "failed": 0})
+        stats["sent" if delivered else "failed"] += 1
+
+    async def deliver(self, payload, webhook_url, name=None):
+        """
+        Send one payload, pacing it by the webhook's rate-limit bucket.
+        Waits out 429 responses as instructed and retries other failures
+        with exponential backoff and jitter.
+        """
+        bucket = self.get_bucket(webhook_url)
+        rate_limited = 0
+        attempt = 0
+
+        while attempt < MAX_RETRIES:
+            await self.global_bucket.acquire()
+            await bucket.acquire()
+
+            try:
+                started = time.perf_counter()
+                try:
+                    response = await asyncio.to_thread(post_webhook, webhook_url, payload)
+                finally:
+                    post_time = time.perf_counter() - started
+                    metrics.WEBHOOK_POST_SECONDS.observe(post_time, webhook=name)
+                    profiling.record_send(name, post_time)
+                bucket.update(response.headers)
+
+                if response.status_code != 429:
+                    self.posts += 1
+                    return True
+
+                # Rate limited: wait exactly as long as Discord asks and try again
+                self.rate_limited += 1
+                rate_limited += 1
+                metrics.WEBHOOK_RETRIES.inc(webhook=name, reason="rate_limited")
+                retry_after = get_retry_after(response)
+                if response.headers.get('X-RateLimit-Global', '').lower() == 'true':
+                    self.global_bucket.block(retry_after)
+                else:
+                    bucket.block(retry_after)
+
+                if rate_limited > MAX_RATE_LIMITED:
+                    print(f"❌ Giving up on webhook after {rate_limited} rate-limit responses")
+                    return False
+                print(f"⏳ Rate limited by Discord, retrying in {retry_after:.1f}s...")
+
+            except requests.exceptions.HTTPError as e:
+                status = e.response.status_code if e.response is not None else None
+                if status is not None and 400 <= status < 500:
+                    # The request itself is wrong (bad URL, deleted webhook), retrying won't help
+                    print(f"❌ Webhook rejected with HTTP {status}, not retrying: {e}")
+                    return False
+                attempt = await self.retry_after_failure(attempt, e, name)
+
+            except requests.exceptions.RequestException as e:
+                attempt = await self.retry_after_failure(attempt, e, name)
+
+        return False
+
+    async def retry_after_failure(self, attempt, error, name=None):
+        """Back off after a failed attempt and return the next attempt number"""
+        attempt += 1
+        if attempt < MAX_RETRIES:
+            metrics.WEBHOOK_RETRIES.inc(webhook=name, reason="error")
+            delay = backoff_delay(attempt - 1)
+            print(f"⚠️  Attempt {attempt} failed, retrying in {delay:.1f}s...")
+            await asyncio.sleep(delay)
+        else:
+            print(f"❌ Failed to send webhook after {MAX_RETRIES} attempts: {error}")
+        return attempt
+
+    async def collect_batch(self, queue, first):
+        """
+        Gather the messages queued for one webhook within the coalescing
+        window of the first one, up to MAX_EMBEDS.
+
+        Returns:
+            list: Queue entries to send in one post, oldest first
+        """
+        batch = [first]
+        deadline = first[0] + self.coalesce_window
+
+        while len(batch) < MAX_EMBEDS:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    entry = await asyncio.wait_for(queue.get(), remaining)
+                else:
+                    entry = queue.get_nowait()
+            except (asyncio.TimeoutError, asyncio.QueueEmpty):
+                break
+            batch.append(entry)
+
+        return batch
+
+    async def run(self, webhook_url):
+        """Background worker: deliver one webhook's messages in order, forever"""
+        queue = self.queues[webhook_url]
+
+        while True:
+            batch = await self.collect_batch(queue, await queue.get())
+            target = batch[0][2]
+            payload = build_batch_payload([(message, entry_target.role_id)
+                                           for _, message, entry_target, _, _ in batch])
+
+            try:
+                delivered = await self.deliver(payload, target.webhook_url, target.name)
+            except Exception as e:
+                print(f"❌ Unexpected error sending webhook: {e}")
+                traceback.print_exc()
+                delivered = False
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+            sent_at = time.monotonic()
+            for queued_at, message, entry_target, future, pending_id in batch:
+                # Delivered or given up on; a cancelled send stays pending for the next run
+                if self.store and pending_id:
+                    self.store.remove_pending(pending_id)
+
+                latency = sent_at - queued_at
+                self.count_result(entry_target, delivered)
+                metrics.WEBHOOK_MESSAGES.inc(webhook=entry_target.name, result="sent" if delivered else "failed")
+                if delivered:
+                    metrics.DELIVERY_SECONDS.observe(latency, webhook=entry_target.name)
+                    self.sent += 1
+                    self.last_latency = latency
+                    self.max_latency = max(self.max_latency, latency)
+                    print(f"✅ Message sent successfully to {entry_target.name} in {latency:.1f}s "
+                          f"({self.queue_depth()} queued): {message}")
+                else:
+                    self.failed += 1
+
+                if not future.done():
+                    future.set_result(delivered)
+
+            if delivered and len(batch) > 1:
+                print(f"📦 Sent {len(batch)} messages to {target.name} in one post")
+
+    def queue_depth(self, webhook_url=None):
+        """Get the number of messages waiting for one webhook, or across all of them"""
+        if webhook_url is not None:
+            queue = self.queues.get(webhook_url)
+            return queue.qsize() if queue else 0
+        return sum(queue.qsize() for queue in self.queues.values())
+
+    def stats(self):
+        """
+        Get delivery counters.
+
+        Returns:
+            dict: queue depth, sent/failed/dropped counts and delivery latencies
+        """
+        return {
+            "queue_depth": self.queue_depth(),
+            "sent": self.sent,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "rate_limited": self.rate_limited,
+            "posts": self.posts,
+            "last_latency": self.last_latency,
+            "max_latency": self.max_latency,
+            "targets": self.target_stats,
+        }
+
+    def format_stats(self):
+        """Get a summary of delivery for log output, one line per target"""
+        stats = self.stats()
+        lines = [f"📨 Webhooks - sent: {stats['sent']} in {stats['posts']} posts, failed: {stats['failed']}, "
+                 f"dropped: {stats['dropped']}, rate limited: {stats['rate_limited']}, "
+                 f"queued: {stats['queue_depth']}, max delivery latency: {stats['max_latency']:.1f}s"]
+        for name, target_stats in stats["targets"].items():
+            lines.append(f"   - {name}: sent {target_stats['sent']}, failed {target_stats['failed']}")
+        return '\n'.join(lines)
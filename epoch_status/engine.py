@@ -0,0 +1,476 @@
+#!/usr/bin/env python3
+"""
+Epoch Status Monitor Engine
+Runs any number of status monitors on one asyncio event loop. Each monitor
+watches a set of realms on one status source and is checked on its own
+interval, so a slow upstream never holds up the others.
+"""
+
+import asyncio
+import itertools
+import time
+import requests
+from datetime import datetime
+import traceback
+from .delivery import DeliveryQueue, COALESCE_WINDOW
+from .http_client import format_connection_stats, format_fetch_stats
+from .state import StateStore, STATE_FILE
+from .history import HistoryWriter
+from .scheduler import AdaptiveScheduler
+from .debounce import Debouncer, UNSTABLE, SETTLED
+from . import metrics, profiling
+from .metrics import MetricsServer
+from . import STARTED_AT
+
+# Numbers each Monitor, so a monitor replaced on reload gets its own conditional GET state
+_monitor_ids = itertools.count(1)
+
+# perf_counter() when main() started, set by mark_ready() for the startup report
+_ready_at = None
+
+# Configuration
+CHECK_INTERVAL = 30  # default seconds between checks
+
+def join_names(names):
+    """Join realm names for a message, e.g. "Auth, Kezan and Gurubashi" """
+    names = list(names)
+    if len(names) <= 1:
+        return ''.join(names)
+    return f"{', '.join(names[:-1])} and {names[-1]}"
+
+def evaluate_transition(previous, current):
+    """
+    Decide whether a status change should be announced.
+    Announces when every realm is UP again after a change, or when any
+    realm went DOWN from previously being UP.
+
+    Args:
+        previous (dict): realm -> "UP"/"DOWN" from the last check
+        current (dict): realm -> "UP"/"DOWN" from this check
+
+    Returns:
+        str or None: The message content to send, None if nothing should be sent
+    """
+    realms = list(current)
+    changed = any(current[realm] != previous.get(realm) for realm in realms)
+
+    if all(current[realm] == "UP" for realm in realms):
+        # For UP status: all servers must be UP and at least one changed
+        if not changed:
+            return None
+        if len(realms) == 1:
+            return f"✅ {realms[0]} Server is UP"
+        if len(realms) == 2:
+            return f"✅ Both {realms[0]} and {realms[1]} servers are UP"
+        return f"✅ All {join_names(realms)} servers are UP"
+
+    # For DOWN status: any server went DOWN from previously being UP
+    went_down = any(previous.get(realm) == "UP" and current[realm] == "DOWN" for realm in realms)
+    if not went_down:
+        return None
+
+    down = [realm for realm in realms if current[realm] == "DOWN"]
+    if len(down) == len(realms) and len(down) == 2:
+        return f"❌ Both {down[0]} and {down[1]} servers are DOWN"
+    if len(down) == len(realms) and len(down) > 2:
+        return f"❌ All {join_names(down)} servers are DOWN"
+    if len(down) == 1:
+        return f"❌ {down[0]} Server is DOWN"
+    return f"❌ {join_names(down)} servers are DOWN"
+
+def describe_events(events, current):
+    """
+    Notices for realms that started or stopped flapping.
+
+    Args:
+        events (dict): realm -> debounce event from this check
+        current (dict): realm -> confirmed status
+
+    Returns:
+        list: Notice lines, one per realm
+    """
+    notices = []
+    for realm, event in events.items():
+        if event == UNSTABLE:
+            notices.append(f"⚠️ {realm} Server is unstable (status keeps changing), "
+                           f"further changes are held until it settles")
+        elif event == SETTLED:
+            notices.append(f"〰️ {realm} Server has settled and is {current[realm]}")
+    return notices
+
+def get_webhook_message(content):
+    """
+    Get the webhook message for the given content.
+
+    Returns:
+        str: The message to send via webhook with timestamp
+    """
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    if content:
+        message = f"{content}\n\n🕐 Detected at: {timestamp}"
+    else:
+        message = f"Status update triggered at {timestamp}"
+
+    return message
+
+class Monitor:
+    """
+    One status source and the realms watched on it.
+
+    fetch_status(realms, cache_key=...) is a blocking call returning a dict of
+    realm -> "UP"/"DOWN" (None for realms it could not parse), or None when
+    the upstream content is unchanged since the last call.
+    """
+
+    def __init__(self, source, fetch_status, realms, interval=CHECK_INTERVAL, name=None, scheduler=None,
+                 sources=(), debouncer=None, settings=None):
+        self.source = source
+        self.fetch_status = fetch_status
+        self.sources = list(sources)  # StatusSource adapters behind fetch_status
+        self.realms = list(realms)
+        self.interval = interval
+        self.name = name or source
+        self.cache_key = f"{self.name}#{next(_monitor_ids)}"
+        # Without an adaptive scheduler the monitor checks on a fixed interval
+        self.scheduler = scheduler or AdaptiveScheduler(interval, interval, name=self.name)
+        # Raw samples go through the debouncer, previous holds the confirmed statuses
+        self.debouncer = debouncer or Debouncer(self.realms)
+        self.changed = False
+        self.error = False
+        self.previous = None
+        self.last_sample = None
+        self.events = {}
+        self.check_count = 0
+        self.observed = None  # statuses seen by the last check, for the history log
+        self.last_latency = None
+        self.settings = settings  # what the monitor was built from, to tell whether a reload changes it
+        self.checking = False
+        self.retired = False
+
+    def close(self):
+        """Release what fetch_status holds once checks are over, e.g. a consensus source's threads"""
+        close = getattr(self.fetch_status, 'close', None)
+        if close is not None:
+            close()
+
+    def check(self):
+        """
+        Run one blocking status check.
+
+        Returns:
+            tuple or None: (previous, current) confirmed statuses to diff, None
+            if there is nothing to compare yet or nothing to announce
+        """
+        self.check_count += 1
+        self.observed = None
+        self.changed = False
+        self.error = False
+        self.events = {}
+        started = time.perf_counter()
+        statuses = self.fetch_status(self.realms, cache_key=self.cache_key)
+        self.last_latency = time.perf_counter() - started
+
+        if statuses is None:
+            # Nothing changed upstream: the last sample counts again, so
+            # pending confirmations still make progress
+            statuses = self.last_sample
+            if statuses is None:
+                return None
+        self.observed = statuses
+
+        missing = [realm for realm in self.realms if statuses.get(realm) is None]
+        if missing:
+            print(f"⚠️  [{self.name}] Could not parse server status for {join_names(missing)}")
+            self.error = True
+            # An unchanged body next time is this same failure, not the last good sample
+            self.last_sample = statuses
+            return None
+
+        with profiling.phase("diff"):
+            last = self.last_sample
+            # Nothing to compare with right after a parse failure; the debouncer still gets the sample
+            self.changed = last is not None and None not in last.values() and statuses != last
+            self.last_sample = statuses
+            self.events = self.debouncer.update(statuses)
+            confirmed = self.debouncer.confirmed
+
+        # Initialize previous values on the first successful check
+        if self.previous is None:
+            print(f"📝 [{self.name}] Initializing status tracking...")
+            self.previous = confirmed
+            return None
+
+        if self.changed and not self.events and confirmed == self.previous:
+            unstable = self.debouncer.unstable
+            state = f"{join_names(unstable)} unstable" if unstable else "awaiting confirmation"
+            print(f"⏳ [{self.name}] Status change not confirmed yet ({state})")
+
+        previous = self.previous
+        # Update stored values regardless of outcome
+        self.previous = confirmed
+        if confirmed == previous and not self.events:
+            return None
+        return previous, confirmed
+
+def build_deliveries(monitor, previous, current, targets):
+    """
+    Work out the message for every target from one check.
+    Each target's transition is evaluated over its own realm filter only,
+    and any unstable/settled notices for its realms go in the same message.
+
+    Returns:
+        list: (target, message) pairs to deliver
+    """
+    deliveries = []
+    for target in targets:
+        realms = target.filter_realms(current)
+        if not realms:
+            continue
+
+        content = evaluate_transition({realm: previous[realm] for realm in realms},
+                                      {realm: current[realm] for realm in realms})
+        lines = [content] if content else []
+        lines += describe_events({realm: event for realm, event in monitor.events.items() if realm in realms},
+                                 current)
+        if lines:
+            deliveries.append((target, get_webhook_message('\n'.join(lines))))
+
+    if deliveries:
+        summary = ', '.join(f"{realm}: {status}" for realm, status in current.items())
+        print(f"🚨 [{monitor.name}] Status change detected! {summary}")
+
+    return deliveries
+
+async def run_monitor(monitor, delivery, targets, store, history):
+    """Check one monitor forever on its own interval, queueing messages for every target"""
+    loop = asyncio.get_running_loop()
+
+    try:
+        while not monitor.retired:
+            started = loop.time()
+            changed = error = False
+            error_type = None
+            record = profiling.start_cycle(monitor.name)
+
+            try:
+                monitor.checking = True
+                try:
+                    result = await asyncio.to_thread(profiling.wrap_check(monitor.check))
+                finally:
+                    monitor.checking = False
+                if monitor.retired:
+                    # Replaced by a reload while checking; the replacement takes it from here
+                    profiling.finish_cycle(record)
+                    return
+                changed = monitor.changed
+                error = monitor.error
+                if error:
+                    error_type = "parse"
+                if result:
+                    with profiling.phase("build"):
+                        deliveries = build_deliveries(monitor, *result, targets)
+                    if deliveries:
+                        store.mark_notified(monitor.name)
+                        delivery.submit_all(deliveries)
+
+                if monitor.previous is not None:
+                    store.set_statuses(monitor.name, monitor.previous)
+                if monitor.observed:
+                    history.record(monitor.name, monitor.observed, monitor.last_latency)
+
+            except requests.exceptions.RequestException as e:
+                print(f"🌐 [{monitor.name}] Error fetching status: {e}")
+                error = True
+                error_type = type(e).__name__
+            except Exception as e:
+                print(f"❌ [{monitor.name}] Error during check: {e}")
+                traceback.print_exc()
+                error = True
+                error_type = type(e).__name__
+
+            profiling.finish_cycle(record)
+            record_check_metrics(monitor, loop.time() - started, error_type)
+            if _ready_at is not None:
+                report_startup()
+
+            # Only writes when something changed since the last save
+            store.save()
+
+            # Wait out the rest of the (adaptive) interval before the next check
+            interval = monitor.scheduler.next_interval(changed=changed, error=error)
+            await asyncio.sleep(max(interval - (loop.time() - started), 0))
+    finally:
+        monitor.close()
+
+def record_check_metrics(monitor, duration, error_type=None):
+    """Update the metrics endpoint's view of one finished check"""
+    metrics.CHECKS.inc(monitor=monitor.name)
+    metrics.POLL_SECONDS.observe(duration, monitor=monitor.name)
+    if error_type:
+        metrics.POLL_ERRORS.inc(monitor=monitor.name, type=error_type)
+    if monitor.previous:
+        unstable = monitor.debouncer.unstable
+        for realm, status in monitor.previous.items():
+            metrics.REALM_UP.set(1 if status == "UP" else 0, monitor=monitor.name, realm=realm)
+            metrics.REALM_UNSTABLE.set(1 if realm in unstable else 0, monitor=monitor.name, realm=realm)
+
+def mark_ready():
+    """Note that the program is imported and starting, so the first check reports the startup time"""
+    global _ready_at
+    _ready_at = time.perf_counter()
+
+def report_startup():
+    """Print how long it took from starting the program to the first finished check, once"""
+    global _ready_at
+    now = time.perf_counter()
+    print(f"⚡ First check done {(now - STARTED_AT) * 1000:.0f} ms after start "
+          f"(imports {(_ready_at - STARTED_AT) * 1000:.0f} ms)")
+    _ready_at = None
+
+def restore_state(store, monitors):
+    """Seed each monitor with its last saved statuses, if they cover the same realms"""
+    for monitor in monitors:
+        statuses = store.get_statuses(monitor.name)
+        if statuses and set(statuses) == set(monitor.realms):
+            monitor.previous = statuses
+            monitor.debouncer.seed(statuses)
+            summary = ', '.join(f"{realm}: {status}" for realm, status in statuses.items())
+            print(f"💾 [{monitor.name}] Resuming from saved status - {summary}")
+
+def requeue_pending(store, delivery, targets):
+    """Queue messages a previous run did not get to deliver"""
+    targets_by_url = {target.webhook_url: target for target in targets}
+    for entry in store.take_pending():
+        target = targets_by_url.get(entry["webhook_url"])
+        if target is None:
+            print("⚠️  Dropping saved message for a webhook that is no longer configured")
+            continue
+        print(f"📤 Re-queueing undelivered message for {target.name}")
+        delivery.submit(entry["message"], target)
+
+class MonitorGroup:
+    """
+    The running monitors. Monitors can be started and
+    retired while the loop runs: a retired monitor that is in the middle of a
+    check finishes it and then stops, so a reload never cuts off a poll.
+    """
+
+    def __init__(self, delivery, targets, store, history):
+        self.delivery = delivery
+        self.targets = targets  # shared with every run_monitor, replaced in place by set_targets()
+        self.store = store
+        self.history = history
+        self.tasks = {}  # monitor -> its asyncio task
+        self.stopped = asyncio.Event()
+
+    @property
+    def monitors(self):
+        return list(self.tasks)
+
+    def start(self, monitor):
+        """Start checking a monitor"""
+        loop = asyncio.get_running_loop()
+        self.tasks[monitor] = loop.create_task(
+            run_monitor(monitor, self.delivery, self.targets, self.store, self.history))
+
+    def retire(self, monitor):
+        """Stop a monitor, letting a check in progress finish first"""
+        task = self.tasks.pop(monitor, None)
+        monitor.retired = True
+        if task and not monitor.checking:
+            task.cancel()
+
+    def set_targets(self, targets):
+        """Swap the webhook targets; checks pick them up from their next delivery"""
+        self.targets[:] = targets
+
+    async def wait(self):
+        await self.stopped.wait()
+
+    def cancel_all(self):
+        for task in list(self.tasks.values()):
+            task.cancel()
+
+async def run_all(monitors, delivery, targets, store, history, watchers=()):
+    """
+    Run all monitors concurrently until cancelled.
+
+    Args:
+        watchers: Functions taking the MonitorGroup and returning a coroutine
+            to run alongside, e.g. a config watcher that adds and retires monitors
+    """
+    profiling.handle_signal(asyncio.get_running_loop())
+    requeue_pending(store, delivery, targets)
+    group = MonitorGroup(delivery, targets, store, history)
+    for monitor in monitors:
+        group.start(monitor)
+
+    try:
+        await asyncio.gather(group.wait(), *[watcher(group) for watcher in watchers])
+    finally:
+        group.cancel_all()
+
+def describe_target(target):
+    realms = join_names(target.realms) if target.realms else "all realms"
+    print(f"📣 [{target.name}] Notifying for {realms}")
+
+def describe_monitor(monitor):
+    scheduler = monitor.scheduler
+    if scheduler.fixed:
+        every = f"every {scheduler.floor} seconds"
+    else:
+        every = f"every {scheduler.floor}-{scheduler.ceiling} seconds (adaptive)"
+    print(f"👀 [{monitor.name}] Watching {join_names(monitor.realms)} {every}")
+
+def run_monitors(monitors, targets, coalesce_window=COALESCE_WINDOW, metrics_port=None,
+                 metrics_host=metrics.METRICS_HOST, watchers=(), state_file=STATE_FILE):
+    """Run the monitoring event loop until Ctrl+C, serving metrics if a port is given"""
+    for target in targets:
+        describe_target(target)
+    for monitor in monitors:
+        describe_monitor(monitor)
+    if coalesce_window:
+        print(f"📦 Messages within {coalesce_window:g}s of each other are sent as one post")
+    print(f"🔄 Starting monitoring loop...")
+    print("⏹️  Press Ctrl+C to stop monitoring")
+    print("-" * 50)
+
+    store = StateStore(state_file, legacy_path=STATE_FILE)
+    store.load()
+    restore_state(store, monitors)
+    delivery = DeliveryQueue(store=store, coalesce_window=coalesce_window)
+    history = HistoryWriter()
+
+    metrics.QUEUE_DEPTH.set_function(lambda: {(target.name,): delivery.queue_depth(target.webhook_url)
+                                              for target in targets})
+    metrics_server = None
+    if metrics_port:
+        metrics_server = MetricsServer(metrics_port, metrics_host)
+        try:
+            metrics_server.start()
+        except OSError as e:
+            print(f"⚠️  Could not start the metrics endpoint on port {metrics_port}: {e}")
+            metrics_server = None
+
+    try:
+        asyncio.run(run_all(monitors, delivery, targets, store, history, watchers))
+
+    except KeyboardInterrupt:
+        print("\n\n⏹️  Stopping monitor...")
+        print(format_connection_stats())
+        print(format_fetch_stats())
+        print(delivery.format_stats())
+        profiling.print_summary()
+        store.save()
+        history.close()
+        if metrics_server:
+            metrics_server.stop()
+        print("👋 Monitor stopped successfully!")
+
+    except Exception as e:
+        print(f"\n❌ Unexpected error: {e}")
+        traceback.print_exc()
+        profiling.print_summary()
+        store.save()
+        input("Press Enter to exit...")
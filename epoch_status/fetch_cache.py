@@ -0,0 +1,521 @@
+#!/usr/bin/env python3
+"""
+Epoch Status Fetch Cache
+Shares upstream responses between monitors, keyed by URL, so a status page
+watched by many monitors is downloaded once per CACHE_TTL instead of once
+per monitor. It is off by default: a cached body is always downloaded in
+full, and a single monitor per site gains nothing but staleness from it.
+Monitors in one process that ask for the same URL at the same time wait for
+a single request (single-flight).
+
+Backends:
+    memory - this process only
+    disk   - a directory shared by the processes that use it
+    socket - a small cache server on a local TCP port, started by whichever
+             process on this host needs it first. Client and server prove to
+             each other that they know the token in the cache directory
+             (readable by its owner only) before anything else is exchanged
+With disk and socket, the right to fetch a URL is shared as well, so
+processes wait for each other's request instead of sending their own.
+A failed fetch is shared too: for FAILURE_TTL seconds every monitor gets
+the same error instead of trying the unreachable upstream again in turn.
+"""
+
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import socket
+import socketserver
+import tempfile
+import threading
+import time
+
+# Configuration
+CACHE_KINDS = ('off', 'memory', 'disk', 'socket')
+DEFAULT_CACHE = 'off'
+CACHE_TTL = 5  # seconds a fetched response is served to other monitors
+CACHE_DIR = '.fetch-cache'  # shared directory of DiskBackend
+CACHE_HOST = '127.0.0.1'  # the cache server only listens on this machine
+CACHE_PORT = 8787  # port of the socket backend's cache server
+SOCKET_TIMEOUT = 2  # seconds to wait for the cache server
+TOKEN_FILE = 'socket.token'  # shared secret of the socket backend, in the cache directory
+MAX_HEADER_SIZE = 64 * 1024  # bytes of a cache server message's header line
+MAX_CONTENT_SIZE = 32 * 1024 * 1024  # bytes of a cache server message's content
+FAILURE_TTL = 5  # seconds a failed fetch is reported to other monitors instead of retried
+LOCK_TIMEOUT = 30  # seconds after which another process's fetch lock is considered abandoned
+LOCK_POLL = 0.05  # seconds between checks while another process fetches
+
+class FetchError(Exception):
+    """A fetch of the key failed, in this or another thread or process"""
+
+class CachedResponse:
+    """
+    An upstream response body with its validators, as kept in the cache.
+    A failed fetch is kept as the last good response (if any) with error set.
+    """
+
+    def __init__(self, content, etag=None, last_modified=None, fetched_at=None, error=None):
+        self.content = content
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at if fetched_at is not None else time.time()
+        self.error = error
+        self.digest = hashlib.sha1(content).digest()
+
+    def age(self):
+        return time.time() - self.fetched_at
+
+    def refreshed(self):
+        """The same response stamped as fetched now (after a 304)"""
+        return CachedResponse(self.content, self.etag, self.last_modified)
+
+    def failed(self, error):
+        """This response marked as the result of a fetch that failed now"""
+        return CachedResponse(self.content, self.etag, self.last_modified, error=error)
+
+    def header(self):
+        """Everything but the body, for storing or sending next to it"""
+        return {"etag": self.etag, "last_modified": self.last_modified, "fetched_at": self.fetched_at,
+                "error": self.error}
+
+    @classmethod
+    def from_header(cls, header, content):
+        return cls(content, header.get("etag"), header.get("last_modified"), header.get("fetched_at"),
+                   header.get("error"))
+
+class MemoryBackend:
+    """Responses kept in this process only"""
+
+    def __init__(self):
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            return self.entries.get(key)
+
+    def put(self, key, entry):
+        with self.lock:
+            self.entries[key] = entry
+
+    def acquire(self, key):
+        # Threads are already serialized per key by FetchCache
+        return True
+
+    def release(self, key):
+        pass
+
+class DiskBackend:
+    """
+    Responses kept as files in a directory shared by several processes.
+    A lock file per key makes one process fetch while the others wait for
+    its result; a lock older than LOCK_TIMEOUT is taken over.
+    """
+
+    def __init__(self, directory=CACHE_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key, suffix):
+        return os.path.join(self.directory, hashlib.sha1(key.encode('utf-8')).hexdigest() + suffix)
+
+    def get(self, key):
+        try:
+            with open(self.path(key, '.bin'), 'rb') as f:
+                header = json.loads(f.readline())
+                content = f.read()
+        except (OSError, ValueError):
+            return None
+        if header.get("key") != key:
+            return None
+        return CachedResponse.from_header(header, content)
+
+    def put(self, key, entry):
+        header = dict(entry.header(), key=key)
+        fd, temp_path = tempfile.mkstemp(prefix='.entry-', suffix='.tmp', dir=self.directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(json.dumps(header).encode('utf-8') + b'\n')
+                f.write(entry.content)
+            os.replace(temp_path, self.path(key, '.bin'))
+        except OSError as e:
+            print(f"⚠️  Warning: Could not write to the fetch cache in {self.directory}: {e}")
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+    def acquire(self, key):
+        """Take the fetch lock of a key, False if another process holds it"""
+        path = self.path(key, '.lock')
+        try:
+            os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return True
+        except FileExistsError:
+            pass
+        except OSError:
+            # Unusable directory: fetch without coordinating
+            return True
+        try:
+            if time.time() - os.path.getmtime(path) > LOCK_TIMEOUT:
+                os.remove(path)
+        except OSError:
+            pass
+        return False
+
+    def release(self, key):
+        try:
+            os.remove(self.path(key, '.lock'))
+        except OSError:
+            pass
+
+def load_token(directory=CACHE_DIR):
+    """
+    Get the socket backend's shared secret, creating it on first use.
+
+    Returns:
+        str: The token every process using the cache directory shares
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, TOKEN_FILE)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            token = f.read().strip()
+        if token:
+            return token
+    except FileNotFoundError:
+        pass
+
+    # mkstemp creates the file readable by its owner only; linking it into place
+    # fails if another process created the token first, and then that one is used
+    fd, temp_path = tempfile.mkstemp(prefix='.token-', dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(secrets.token_hex(32))
+        try:
+            os.link(temp_path, path)
+        except FileExistsError:
+            pass
+        except OSError:
+            # No hard links on this file system
+            if not os.path.exists(path):
+                os.replace(temp_path, path)
+    finally:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read().strip()
+
+def sign(token, role, nonce):
+    """Proof that role ("client" or "server") knows the token, for the other side's nonce"""
+    return hmac.new(token.encode('utf-8'), f"{role}:{nonce}".encode('utf-8'), hashlib.sha256).hexdigest()
+
+def send_message(stream, header, content=b''):
+    """Write one message of the cache server protocol: a JSON header line, then content"""
+    stream.write(json.dumps(dict(header, length=len(content))).encode('utf-8') + b'\n' + content)
+    stream.flush()
+
+def read_message(stream):
+    """
+    Read one message written by send_message().
+
+    Returns:
+        tuple: (header dict, content bytes)
+
+    Raises:
+        ConnectionError: The connection was closed
+        ValueError: The message is malformed or larger than allowed
+    """
+    line = stream.readline(MAX_HEADER_SIZE + 1)
+    if not line:
+        raise ConnectionError("cache connection closed")
+    if len(line) > MAX_HEADER_SIZE:
+        raise ValueError("cache message header too large")
+    header = json.loads(line)
+    length = header.get("length", 0) if isinstance(header, dict) else None
+    if not isinstance(length, int) or not 0 <= length <= MAX_CONTENT_SIZE:
+        raise ValueError(f"invalid cache message length {length!r}")
+    content = stream.read(length)
+    if len(content) != length:
+        raise ConnectionError("cache connection closed")
+    return header, content
+
+class CacheRequestHandler(socketserver.StreamRequestHandler):
+    """Answers get/put/acquire/release requests from the server's MemoryBackend, once the client proved itself"""
+
+    def handle(self):
+        try:
+            if not self.authenticate():
+                return
+        except (ConnectionError, ValueError):
+            return
+        while True:
+            try:
+                request, content = read_message(self.rfile)
+            except (ConnectionError, ValueError):
+                return
+            self.server.handle_request_message(self.wfile, request, content)
+
+    def authenticate(self):
+        """
+        Challenge-response in both directions: the client sends a nonce and
+        gets the server's proof, then proves itself for the server's nonce.
+        The token itself never crosses the connection.
+        """
+        token = self.server.token
+        hello, _ = read_message(self.rfile)
+        nonce = secrets.token_hex(16)
+        send_message(self.wfile, {"nonce": nonce, "proof": sign(token, "server", hello.get("nonce"))})
+        reply, _ = read_message(self.rfile)
+        if not hmac.compare_digest(str(reply.get("proof")), sign(token, "client", nonce)):
+            return False
+        send_message(self.wfile, {"ok": True})
+        return True
+
+class CacheServer(socketserver.ThreadingTCPServer):
+    """The shared side of SocketBackend: responses and fetch leases of every process on this host"""
+
+    daemon_threads = True
+    # Lets a process take over the port right after the previous server exited; on
+    # Windows it would let two servers share the port instead
+    allow_reuse_address = os.name != 'nt'
+
+    def __init__(self, address, token):
+        super().__init__(address, CacheRequestHandler)
+        self.token = token
+        self.backend = MemoryBackend()
+        self.leases = {}  # key -> time.time() the fetch lock expires
+        self.leases_lock = threading.Lock()
+
+    def handle_request_message(self, stream, request, content):
+        op, key = request.get("op"), request.get("key")
+        if op == "get":
+            entry = self.backend.get(key)
+            if entry is None:
+                send_message(stream, {"found": False})
+            else:
+                send_message(stream, dict(entry.header(), found=True), entry.content)
+        elif op == "put":
+            self.backend.put(key, CachedResponse.from_header(request, content))
+            send_message(stream, {"ok": True})
+        elif op == "acquire":
+            now = time.time()
+            with self.leases_lock:
+                granted = self.leases.get(key, 0) < now
+                if granted:
+                    self.leases[key] = now + LOCK_TIMEOUT
+            send_message(stream, {"ok": granted})
+        elif op == "release":
+            with self.leases_lock:
+                self.leases.pop(key, None)
+            send_message(stream, {"ok": True})
+        else:
+            send_message(stream, {"error": f"unknown op {op}"})
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, name='fetch-cache-server', daemon=True).start()
+        return self
+
+class SocketBackend:
+    """
+    Responses kept by a CacheServer on a local port, shared by every process
+    on this host that uses the same port. The first process that finds no
+    server running starts one in a background thread; when that process
+    exits, the next one to notice takes over. Without a reachable server
+    every call behaves like an empty cache, so monitoring carries on. The
+    same goes for a server that cannot prove it knows the token, e.g. another
+    program listening on the port.
+    """
+
+    def __init__(self, port=CACHE_PORT, host=CACHE_HOST, directory=CACHE_DIR):
+        self.address = (host, port)
+        self.token = load_token(directory)
+        self.server = None
+        self.local = threading.local()  # each thread keeps its own connection
+
+    def call(self, request, content=b''):
+        """
+        Send one request to the cache server, starting one here if none answers.
+
+        Returns:
+            tuple or None: (reply header, content), None if no server could be reached
+        """
+        for attempt in range(2):
+            try:
+                stream = getattr(self.local, 'stream', None)
+                if stream is None:
+                    connection = socket.create_connection(self.address, timeout=SOCKET_TIMEOUT)
+                    stream = self.local.stream = connection.makefile('rwb')
+                    connection.close()  # the stream keeps the socket open
+                    self.authenticate(stream)
+                send_message(stream, request, content)
+                return read_message(stream)
+            except (OSError, ValueError):
+                self.disconnect()
+                if attempt == 0:
+                    self.start_server()
+        return None
+
+    def authenticate(self, stream):
+        """The client side of CacheRequestHandler.authenticate()"""
+        nonce = secrets.token_hex(16)
+        send_message(stream, {"op": "hello", "nonce": nonce})
+        challenge, _ = read_message(stream)
+        if not hmac.compare_digest(str(challenge.get("proof")), sign(self.token, "server", nonce)):
+            raise ConnectionError("the process on the cache port does not know the token")
+        send_message(stream, {"proof": sign(self.token, "client", challenge.get("nonce"))})
+        reply, _ = read_message(stream)
+        if not reply.get("ok"):
+            raise ConnectionError("the cache server rejected the token")
+
+    def disconnect(self):
+        stream = getattr(self.local, 'stream', None)
+        self.local.stream = None
+        if stream is not None:
+            try:
+                stream.close()
+            except OSError:
+                pass
+
+    def start_server(self):
+        if self.server is not None:
+            return
+        try:
+            self.server = CacheServer(self.address, self.token).start()
+            print(f"🗃️  Fetch cache server started on {self.address[0]}:{self.address[1]}")
+        except OSError:
+            # Another process got there first
+            pass
+
+    def get(self, key):
+        reply = self.call({"op": "get", "key": key})
+        if reply is None or not reply[0].get("found"):
+            return None
+        return CachedResponse.from_header(*reply)
+
+    def put(self, key, entry):
+        self.call(dict(entry.header(), op="put", key=key), entry.content)
+
+    def acquire(self, key):
+        reply = self.call({"op": "acquire", "key": key})
+        return reply is None or bool(reply[0].get("ok"))
+
+    def release(self, key):
+        self.call({"op": "release", "key": key})
+
+class FetchCache:
+    """
+    Serves fresh cached responses and fetches missing or stale ones once.
+    fetch(previous) is called with the last cached response (None if there
+    is none), so it can revalidate with a conditional GET, and returns the
+    new CachedResponse. When fetch raises, the failure is cached for
+    FAILURE_TTL seconds and everyone asking for the key meanwhile, including
+    the threads that waited for it, gets a FetchError.
+    """
+
+    def __init__(self, backend=None, ttl=CACHE_TTL):
+        self.backend = backend or MemoryBackend()
+        self.ttl = ttl
+        self.locks = {}  # key -> lock held by the thread fetching it
+        self.locks_lock = threading.Lock()
+        self.counters = {"fetches": 0, "hits": 0, "joined": 0, "failures": 0}
+
+    def key_lock(self, key):
+        with self.locks_lock:
+            lock = self.locks.get(key)
+            if lock is None:
+                lock = self.locks[key] = threading.Lock()
+            return lock
+
+    def get(self, key, fetch):
+        """
+        Get the response for a key, fetching it if the cached one is older than the TTL.
+
+        Returns:
+            CachedResponse
+
+        Raises:
+            FetchError: The last fetch failed less than FAILURE_TTL seconds ago
+            Exception: Whatever fetch raised, in the thread that called it
+        """
+        # One thread per key at a time; the others find its response when they get the lock
+        lock = self.key_lock(key)
+        if not lock.acquire(blocking=False):
+            self.counters["joined"] += 1
+            lock.acquire()
+        try:
+            waited_since = time.monotonic()
+            locked = False
+            while True:
+                entry = self.backend.get(key)
+                if entry is not None and entry.error is not None:
+                    if entry.age() < FAILURE_TTL:
+                        self.counters["hits"] += 1
+                        raise FetchError(entry.error)
+                    if entry.etag is None and entry.last_modified is None:
+                        # Nothing to revalidate
+                        entry = None
+                elif entry is not None and entry.age() < self.ttl:
+                    self.counters["hits"] += 1
+                    return entry
+                locked = self.backend.acquire(key)
+                if locked:
+                    break
+                # Another process is fetching it; use its response unless it takes too long
+                if time.monotonic() - waited_since > LOCK_TIMEOUT:
+                    break
+                time.sleep(LOCK_POLL)
+
+            try:
+                self.counters["fetches"] += 1
+                try:
+                    fetched = fetch(entry)
+                except Exception as e:
+                    self.counters["failures"] += 1
+                    failure = entry.failed(str(e)) if entry is not None else CachedResponse(b'', error=str(e))
+                    self.backend.put(key, failure)
+                    raise
+                self.backend.put(key, fetched)
+                return fetched
+            finally:
+                if locked:
+                    self.backend.release(key)
+        finally:
+            lock.release()
+
+    def format_stats(self):
+        """Get a one-line summary of cache use for log output"""
+        return (f"🗃️  Fetch cache - upstream fetches: {self.counters['fetches']}, "
+                f"served from cache: {self.counters['hits']} "
+                f"({self.counters['joined']} after waiting for a fetch in progress), "
+                f"failed fetches: {self.counters['failures']}")
+
+def create_cache(kind=DEFAULT_CACHE, ttl=CACHE_TTL, directory=CACHE_DIR, port=CACHE_PORT):
+    """
+    Create the fetch cache configured by fetch_cache= in config.txt.
+
+    Returns:
+        FetchCache or None: None for kind 'off'
+    """
+    if kind == 'off':
+        return None
+    if kind == 'disk':
+        backend = DiskBackend(directory)
+    elif kind == 'socket':
+        backend = SocketBackend(port, directory=directory)
+    else:
+        backend = MemoryBackend()
+    return FetchCache(backend, ttl)
+
+def describe_cache(kind, ttl, directory=CACHE_DIR, port=CACHE_PORT):
+    """Get a one-line description of the cache settings for log output"""
+    if kind == 'off':
+        return "🗃️  Fetch cache off, every monitor polls on its own"
+    shared = {"memory": "between this process's monitors",
+              "disk": f"between processes through {directory}",
+              "socket": f"between processes through {CACHE_HOST}:{port}"}[kind]
+    return f"🗃️  Upstream responses shared {shared} for {ttl:g}s"
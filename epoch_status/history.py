@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Epoch Status History
+Append-only log of every status observation in fixed-width binary records,
+plus a small query tool for uptime, outages and transitions.
+
+Each record is 16 bytes: timestamp (float64), series ID (uint16),
+status (int8: 1 UP, 0 DOWN, -1 unknown), padding, poll latency (float32).
+Series IDs map to "source<TAB>realm" lines in the companion .series file,
+which every writer re-reads under a lock before adding a series, so several
+processes can log to the same file.
+Queries memory-map the log and binary-search the time window, so only the
+records inside the window are ever read.
+
+Usage:
+    python -m epoch_status.history uptime --since 7d
+    python -m epoch_status.history outages --since 2026-01-01 --realm Kezan
+    python -m epoch_status.history transitions --since 24h --source epoch-status.info
+"""
+
+import argparse
+import mmap
+import os
+import re
+import struct
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+# Configuration
+HISTORY_FILE = 'history.bin'
+MAX_SAMPLE_GAP = 300  # seconds a sample is trusted for when computing uptime
+SERIES_LOCK_TIMEOUT = 2  # seconds after which another writer's .series lock is considered abandoned
+
+RECORD = struct.Struct('<dHbxf')
+STATUS_CODES = {"UP": 1, "DOWN": 0, None: -1}
+STATUS_NAMES = {1: "UP", 0: "DOWN", -1: None}
+
+def series_path(path):
+    return path + '.series'
+
+def load_series(path):
+    """Load the series ID -> (source, realm) list from the .series file"""
+    series = []
+    try:
+        with open(series_path(path), 'r', encoding='utf-8') as f:
+            for line in f:
+                source, _, realm = line.rstrip('\n').partition('\t')
+                series.append((source, realm))
+    except FileNotFoundError:
+        pass
+    return series
+
+@contextmanager
+def series_lock(path):
+    """Hold the lock on the .series file, so only one writer adds a series at a time"""
+    lock_path = series_path(path) + '.lock'
+    deadline = time.monotonic() + SERIES_LOCK_TIMEOUT
+    while True:
+        try:
+            os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            break
+        except FileExistsError:
+            if time.monotonic() > deadline:
+                # Left behind by a writer that crashed while holding it
+                break
+            time.sleep(0.01)
+    try:
+        yield
+    finally:
+        try:
+            os.remove(lock_path)
+        except OSError:
+            pass
+
+class HistoryWriter:
+    """Appends observations to the history log"""
+
+    def __init__(self, path=HISTORY_FILE):
+        self.path = path
+        self.series = {}  # (source, realm) -> series ID
+        self.load_series()
+        # Drop a partial record left behind by a crash mid-write
+        if os.path.exists(path):
+            size = os.path.getsize(path)
+            if size % RECORD.size:
+                with open(path, 'r+b') as f:
+                    f.truncate(size - size % RECORD.size)
+        self.file = open(path, 'ab')
+
+    def load_series(self):
+        """
+        Refresh the series IDs from the .series file, which other writers may have added to.
+
+        Returns:
+            int: The number of series in the file, i.e. the next free ID
+        """
+        series = load_series(self.path)
+        for index, key in enumerate(series):
+            self.series.setdefault(key, index)
+        return len(series)
+
+    def series_id(self, source, realm):
+        """Get the ID of a source/realm series, registering it on first use"""
+        key = (source, realm)
+        if key not in self.series:
+            with series_lock(self.path):
+                # Another writer may have registered it, or other series, since we last looked
+                next_id = self.load_series()
+                if key not in self.series:
+                    with open(series_path(self.path), 'a', encoding='utf-8') as f:
+                        f.write(f"{source}\t{realm}\n")
+                    self.series[key] = next_id
+        return self.series[key]
+
+    def record(self, source, statuses, latency=0.0, timestamp=None):
+        """
+        Append one poll result.
+
+        Args:
+            source (str): Monitor name
+            statuses (dict): realm -> "UP"/"DOWN"/None
+            latency (float): Seconds the poll took
+            timestamp (float): Unix time of the poll, now if None
+        """
+        timestamp = timestamp if timestamp is not None else time.time()
+        data = b''.join(RECORD.pack(timestamp, self.series_id(source, realm),
+                                    STATUS_CODES.get(status, -1), latency or 0.0)
+                        for realm, status in statuses.items())
+        self.file.write(data)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+class HistoryReader:
+    """Memory-mapped, read-only view of the history log"""
+
+    def __init__(self, path=HISTORY_FILE):
+        self.series = load_series(path)
+        self.file = open(path, 'rb')
+        size = os.fstat(self.file.fileno()).st_size
+        self.count = size // RECORD.size
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if self.count else b''
+
+    def timestamp_at(self, index):
+        return struct.unpack_from('<d', self.map, index * RECORD.size)[0]
+
+    def bisect(self, timestamp):
+        """Index of the first record at or after the timestamp"""
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self.timestamp_at(middle) < timestamp:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def records(self, since=None, until=None):
+        """
+        Yield (timestamp, source, realm, status, latency) inside the window.
+        """
+        start = self.bisect(since) if since is not None else 0
+        end = self.bisect(until) if until is not None else self.count
+        if start >= end:
+            return
+
+        view = memoryview(self.map)[start * RECORD.size:end * RECORD.size]
+        try:
+            for timestamp, series_id, status, latency in RECORD.iter_unpack(view):
+                source, realm = self.series[series_id] if series_id < len(self.series) else ('?', '?')
+                yield timestamp, source, realm, STATUS_NAMES.get(status), latency
+        finally:
+            view.release()
+
+    def close(self):
+        if self.count:
+            self.map.close()
+        self.file.close()
+
+def matching_records(reader, since, until, source=None, realm=None):
+    for record in reader.records(since, until):
+        if source and record[1] != source:
+            continue
+        if realm and record[2] != realm:
+            continue
+        yield record
+
+def compute_uptime(records, until):
+    """
+    Time-weighted uptime per series. Each sample counts until the next one,
+    at most MAX_SAMPLE_GAP seconds; unknown samples and gaps don't count.
+
+    Returns:
+        dict: (source, realm) -> (up seconds, known seconds, sample count)
+    """
+    totals = {}
+    last = {}
+    for timestamp, source, realm, status, _ in records:
+        key = (source, realm)
+        if key in last:
+            add_span(totals, key, last[key], timestamp)
+        last[key] = (timestamp, status)
+        totals.setdefault(key, [0.0, 0.0, 0])[2] += 1
+
+    for key, sample in last.items():
+        add_span(totals, key, sample, until)
+    return {key: tuple(value) for key, value in totals.items()}
+
+def add_span(totals, key, sample, end):
+    timestamp, status = sample
+    span = min(end - timestamp, MAX_SAMPLE_GAP)
+    if status is None or span <= 0:
+        return
+    entry = totals.setdefault(key, [0.0, 0.0, 0])
+    entry[1] += span
+    if status == "UP":
+        entry[0] += span
+
+def compute_transitions(records):
+    """
+    Returns:
+        list: (timestamp, source, realm, from status, to status)
+    """
+    transitions = []
+    last = {}
+    for timestamp, source, realm, status, _ in records:
+        if status is None:
+            continue
+        key = (source, realm)
+        if key in last and last[key] != status:
+            transitions.append((timestamp, source, realm, last[key], status))
+        last[key] = status
+    return transitions
+
+def compute_outages(records, until):
+    """
+    Returns:
+        list: (source, realm, start, end or None if still down, duration seconds)
+    """
+    outages = []
+    down_since = {}
+    for timestamp, source, realm, status, _ in records:
+        key = (source, realm)
+        if status == "DOWN" and key not in down_since:
+            down_since[key] = timestamp
+        elif status == "UP" and key in down_since:
+            start = down_since.pop(key)
+            outages.append((source, realm, start, timestamp, timestamp - start))
+
+    for (source, realm), start in down_since.items():
+        outages.append((source, realm, start, None, until - start))
+    return sorted(outages, key=lambda outage: outage[2])
+
+def parse_time(value, now):
+    """Parse an ISO date/time or a relative time like 30m, 24h or 7d"""
+    if value is None:
+        return None
+    match = re.fullmatch(r'(\d+(?:\.\d+)?)([smhd])', value)
+    if match:
+        units = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+        return now - float(match.group(1)) * units[match.group(2)]
+    return datetime.fromisoformat(value).timestamp()
+
+def format_time(timestamp):
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
+
+def format_duration(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    days, hours = divmod(hours, 24)
+    if days:
+        return f"{days}d {hours}h {minutes}m"
+    if hours:
+        return f"{hours}h {minutes}m"
+    return f"{minutes}m {seconds}s"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the Epoch status history log")
+    parser.add_argument('command', choices=['uptime', 'outages', 'transitions'])
+    parser.add_argument('--since', help="Start of the window: ISO time or relative (30m, 24h, 7d)")
+    parser.add_argument('--until', help="End of the window: ISO time or relative, now if omitted")
+    parser.add_argument('--source', help="Only this monitor (e.g. epoch-status.info)")
+    parser.add_argument('--realm', help="Only this realm (e.g. Kezan)")
+    parser.add_argument('--file', default=HISTORY_FILE, help=f"History file (default {HISTORY_FILE})")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.file):
+        print(f"❌ Error: {args.file} not found!")
+        return 1
+
+    now = time.time()
+    since = parse_time(args.since, now)
+    until = parse_time(args.until, now) or now
+
+    reader = HistoryReader(args.file)
+    try:
+        records = matching_records(reader, since, until, args.source, args.realm)
+
+        if args.command == 'uptime':
+            for (source, realm), (up, known, samples) in sorted(compute_uptime(records, until).items()):
+                percent = f"{up / known * 100:.3f}%" if known else "n/a"
+                print(f"📈 {source} {realm}: {percent} uptime over {format_duration(known)} ({samples} samples)")
+
+        elif args.command == 'outages':
+            for source, realm, start, end, duration in compute_outages(records, until):
+                end_text = format_time(end) if end is not None else "ongoing"
+                print(f"❌ {source} {realm}: {format_time(start)} → {end_text} ({format_duration(duration)})")
+
+        else:
+            for timestamp, source, realm, old, new in compute_transitions(records):
+                print(f"🔁 {format_time(timestamp)} {source} {realm}: {old} → {new}")
+    finally:
+        reader.close()
+
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Epoch Status HTTP Client
+Shared, long-lived HTTP session used by the monitors for both status polling
+and Discord delivery, so keep-alive connections are reused between checks.
+"""
+
+import hashlib
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from .fetch_cache import CachedResponse, FetchError
+from . import profiling
+
+# Configuration
+POOL_CONNECTIONS = 10  # number of hosts to keep connection pools for
+POOL_MAXSIZE = 4  # keep-alive connections kept open per host
+CONNECT_TIMEOUT = 5  # seconds
+READ_TIMEOUT = 10  # seconds
+USER_AGENT = 'epoch-status-webhook'
+STREAM_CHUNK_SIZE = 8192  # bytes read at a time from streamed responses
+STREAM_DRAIN_LIMIT = 65536  # unread bytes drained to keep a streamed connection alive
+
+_client = None
+
+
+class HttpClient:
+    """
+    Thin wrapper around a requests.Session with per-host keep-alive pools.
+    Tracks how many requests went over a reused connection versus a new one.
+    """
+
+    def __init__(self, pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE,
+                 connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT):
+        self.timeout = (connect_timeout, read_timeout)
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = USER_AGENT
+        self.adapter = HTTPAdapter(pool_connections=pool_connections,
+                                   pool_maxsize=pool_maxsize,
+                                   max_retries=0)
+        self.session.mount('http://', self.adapter)
+        self.session.mount('https://', self.adapter)
+
+        # Keep counters from pools that get evicted from the pool manager
+        self._evicted_connections = 0
+        self._evicted_requests = 0
+        pools = self.adapter.poolmanager.pools
+        dispose = pools.dispose_func
+
+        def on_evict(pool):
+            self._evicted_connections += pool.num_connections
+            self._evicted_requests += pool.num_requests
+            if dispose:
+                dispose(pool)
+
+        pools.dispose_func = on_evict
+
+        # Conditional GET state per request (validators and last body hash)
+        self._validators = {}
+        self.fetch_counters = {
+            "not_modified": 0,
+            "hash_hits": 0,
+            "full_parses": 0,
+        }
+        # Optional FetchCache shared by every caller of get_if_changed()
+        self.fetch_cache = None
+
+    def get(self, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session.get(url, **kwargs)
+
+    def get_if_changed(self, url, params=None, cache_key=None, consume=None, parse=None, complete=None, **kwargs):
+        """
+        GET a URL, skipping the body when it hasn't changed since the last call.
+        Sends If-None-Match/If-Modified-Since when the upstream gave validators,
+        otherwise compares a hash of the body with the previous one.
+        Callers that each need to see every change pass their own cache_key.
+
+        With consume, the body is streamed: consume(chunks) gets an iterator of
+        byte chunks and may stop early. Only the bytes it read are hashed.
+        With parse, parse(content) handles the whole body instead.
+
+        The validators of a body are only kept once consume() or parse() handled
+        it: if it raises, or complete(result) is false, the next call fetches
+        and handles the body again rather than calling it unchanged.
+
+        With a fetch cache, callers of the same URL share one response body
+        and only the hash comparison is done per cache_key.
+
+        Returns:
+            The consume() or parse() result (the requests.Response without
+            either) if it needs handling, None if the content is unchanged
+        """
+        key = (cache_key, url, tuple(sorted((params or {}).items())))
+        previous = self._validators.get(key, {})
+        if self.fetch_cache is not None:
+            return self.get_cached(key, previous, url, params, consume, parse, complete, **kwargs)
+
+        headers = dict(kwargs.pop('headers', None) or {})
+        if previous.get('etag'):
+            headers['If-None-Match'] = previous['etag']
+        if previous.get('last_modified'):
+            headers['If-Modified-Since'] = previous['last_modified']
+
+        started = time.perf_counter()
+        response = self.get(url, params=params, headers=headers, stream=consume is not None, **kwargs)
+        # elapsed covers connecting (unless the connection was reused) and waiting for the
+        # headers; the rest is the body
+        response_time = response.elapsed.total_seconds()
+        profiling.add_time("response", response_time)
+        if consume is None:
+            profiling.add_time("download", max(time.perf_counter() - started - response_time, 0.0))
+        if response.status_code == 304:
+            self.fetch_counters["not_modified"] += 1
+            response.close()
+            return None
+        if consume is not None and not response.ok:
+            response.close()
+        response.raise_for_status()
+
+        validators = {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+        }
+        if consume is not None:
+            digest = hashlib.sha1()
+
+            def chunks():
+                iterator = response.iter_content(STREAM_CHUNK_SIZE)
+                while True:
+                    started = time.perf_counter()
+                    chunk = next(iterator, None)
+                    profiling.add_time("download", time.perf_counter() - started)
+                    if chunk is None:
+                        return
+                    digest.update(chunk)
+                    yield chunk
+
+            try:
+                result = self.handle(key, lambda: consume(chunks()))
+            finally:
+                self.finish_stream(response)
+            validators['body_hash'] = digest.digest()
+        else:
+            validators['body_hash'] = hashlib.sha1(response.content).digest()
+
+        # Only complete bodies are remembered, so a match was handled successfully before
+        if validators['body_hash'] == previous.get('body_hash'):
+            self._validators[key] = validators
+            self.fetch_counters["hash_hits"] += 1
+            return None
+
+        if consume is None:
+            result = self.handle(key, lambda: parse(response.content) if parse else response)
+        self.fetch_counters["full_parses"] += 1
+        self.remember(key, validators, result, complete)
+        return result
+
+    def handle(self, key, handler):
+        """Run the caller's handler on a body, forgetting the key's validators if it raises"""
+        try:
+            return handler()
+        except Exception:
+            self._validators.pop(key, None)
+            raise
+
+    def remember(self, key, validators, result, complete):
+        """Keep the validators of a body the caller handled completely, otherwise forget the old ones"""
+        if complete is None or complete(result):
+            self._validators[key] = validators
+        else:
+            self._validators.pop(key, None)
+
+    def get_cached(self, key, previous, url, params, consume, parse, complete, **kwargs):
+        """get_if_changed() through the fetch cache: the whole body is shared, so it is never cut short"""
+        cache_url = requests.Request('GET', url, params=params).prepare().url
+        try:
+            entry = self.fetch_cache.get(cache_url, lambda stale: self.fetch_entry(url, params, stale, **kwargs))
+        except FetchError as e:
+            # Another monitor's fetch of the same URL just failed
+            raise requests.exceptions.ConnectionError(f"{e} (shared failure)") from None
+
+        if entry.digest == previous.get('body_hash'):
+            self.fetch_counters["hash_hits"] += 1
+            return None
+
+        content = entry.content
+        if consume is not None:
+            result = self.handle(key, lambda: consume(content[index:index + STREAM_CHUNK_SIZE]
+                                                      for index in range(0, len(content), STREAM_CHUNK_SIZE)))
+        else:
+            result = self.handle(key, lambda: parse(content) if parse else entry)
+        self.fetch_counters["full_parses"] += 1
+        self.remember(key, {'body_hash': entry.digest}, result, complete)
+        return result
+
+    def fetch_entry(self, url, params, stale=None, **kwargs):
+        """
+        Download a response for the fetch cache, revalidating the stale copy if there is one.
+
+        Returns:
+            CachedResponse
+        """
+        headers = dict(kwargs.pop('headers', None) or {})
+        if stale is not None and stale.etag:
+            headers['If-None-Match'] = stale.etag
+        if stale is not None and stale.last_modified:
+            headers['If-Modified-Since'] = stale.last_modified
+
+        started = time.perf_counter()
+        response = self.get(url, params=params, headers=headers, **kwargs)
+        response_time = response.elapsed.total_seconds()
+        profiling.add_time("response", response_time)
+        profiling.add_time("download", max(time.perf_counter() - started - response_time, 0.0))
+        if response.status_code == 304 and stale is not None:
+            self.fetch_counters["not_modified"] += 1
+            return stale.refreshed()
+        response.raise_for_status()
+        return CachedResponse(response.content, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+
+    def finish_stream(self, response):
+        """
+        Release a streamed response that may not have been read to the end.
+        A short unread tail is drained so the connection goes back to the pool;
+        a long one is cheaper to drop than to download.
+        """
+        raw = response.raw
+        drained = 0
+        try:
+            while drained <= STREAM_DRAIN_LIMIT:
+                data = raw.read(STREAM_CHUNK_SIZE, decode_content=False)
+                if not data:
+                    raw.release_conn()
+                    return
+                drained += len(data)
+        except Exception:
+            pass
+        response.close()
+
+    def post(self, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session.post(url, **kwargs)
+
+    def connection_stats(self):
+        """
+        Get connection reuse counters across all host pools.
+
+        Returns:
+            dict: requests, new_connections and reused_connections counts
+        """
+        new_connections = self._evicted_connections
+        total_requests = self._evicted_requests
+        pools = self.adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                new_connections += pool.num_connections
+                total_requests += pool.num_requests
+
+        return {
+            "requests": total_requests,
+            "new_connections": new_connections,
+            "reused_connections": max(total_requests - new_connections, 0),
+        }
+
+    def close(self):
+        self.session.close()
+
+
+def get_client():
+    """Get the process-wide shared HTTP client, creating it on first use"""
+    global _client
+
+    if _client is None:
+        _client = HttpClient()
+    return _client
+
+
+def format_connection_stats():
+    """Get a one-line summary of connection reuse for log output"""
+    stats = get_client().connection_stats()
+    return (f"🔌 HTTP requests: {stats['requests']} "
+            f"(new connections: {stats['new_connections']}, "
+            f"reused: {stats['reused_connections']})")
+
+
+def set_fetch_cache(cache):
+    """Share upstream responses between all monitors of this process through a FetchCache"""
+    get_client().fetch_cache = cache
+
+
+def format_fetch_stats():
+    """Get a one-line summary of how many polls skipped parsing"""
+    client = get_client()
+    counters = client.fetch_counters
+    summary = (f"📦 Polls - not modified (304): {counters['not_modified']}, "
+               f"unchanged body: {counters['hash_hits']}, "
+               f"full parse: {counters['full_parses']}")
+    if client.fetch_cache is not None:
+        summary += "\n" + client.fetch_cache.format_stats()
+    return summary
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Epoch Status JSON Decoding
+loads() decodes whole documents with orjson when it is installed (pip
+install orjson) and with the standard library otherwise. decode_after()
+decodes a single value out of a larger document, so the rest is never turned
+into Python objects; it always uses the standard library, as orjson cannot
+decode a value that is followed by more text.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BACKEND = 'orjson' if orjson is not None else 'json'
+DECODE_WINDOW = 4096  # bytes decoded at first by decode_after(), grown as needed
+
+_decoder = json.JSONDecoder()
+
+def loads(data):
+    """Decode a whole JSON document from bytes or str"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def decode_after(data, marker):
+    """
+    Decode only the JSON value that follows the first match of marker,
+    with the standard library's raw_decode() whatever BACKEND is.
+
+    Args:
+        data (bytes): The JSON document
+        marker (re.Pattern): Bytes pattern matching the text right before the
+            wanted value, e.g. re.compile(rb'"json"\s*:')
+
+    Returns:
+        The decoded value
+
+    Raises:
+        ValueError: If the marker is missing or the value is not valid JSON
+    """
+    match = marker.search(data)
+    if match is None:
+        raise ValueError(f"{marker.pattern.decode()} not found in the response")
+
+    # Only text up to the end of the value is decoded: try a small window and
+    # grow it until the value fits, rather than copying the whole tail
+    start = match.end()
+    window = DECODE_WINDOW
+    while True:
+        complete = start + window >= len(data)
+        # A window may cut a multi-byte character at its end; that part is retried anyway
+        text = data[start:start + window].decode('utf-8', errors='strict' if complete else 'ignore')
+        offset = len(text) - len(text.lstrip())
+        try:
+            value, end = _decoder.raw_decode(text, offset)
+            # A number cut off by the window still decodes, so something must follow it
+            if complete or end < len(text):
+                return value
+        except ValueError:
+            if complete:
+                raise
+        window *= 4
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Epoch Status Metrics
+In-process counters, gauges and histograms for the monitor loop, served in
+the Prometheus text format from an optional HTTP endpoint (metrics_port= in
+config.txt). Recording a sample is a dict lookup and an increment under a
+lock, so the hot path stays cheap whether or not the endpoint is enabled.
+The HTTP server modules are only imported when the endpoint is.
+"""
+
+import bisect
+import threading
+
+# Configuration
+METRICS_HOST = '127.0.0.1'  # only reachable from this machine unless changed
+POLL_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)  # seconds
+PARSE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)  # seconds
+POST_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10)  # seconds
+DELIVERY_BUCKETS = (0.5, 1, 5, 10, 15, 30, 60, 120, 300)  # seconds
+
+def format_labels(names, values, extra=()):
+    """Format label names and values as {a="1",b="2"}"""
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{escape_label(value)}"' for name, value in pairs) + '}'
+
+def escape_label(value):
+    """Escape a label value for the text format"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def format_value(value):
+    """Format a sample value, without a trailing .0 for whole numbers"""
+    if value == int(value):
+        return str(int(value))
+    return repr(float(value))
+
+class Metric:
+    """A named metric with a fixed set of label names"""
+
+    kind = 'untyped'
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self.values = {}  # label values -> value
+        self.lock = threading.Lock()
+
+    def key(self, labels):
+        return tuple(labels.get(name, '') for name in self.labels)
+
+    def header(self):
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+
+    def samples(self):
+        with self.lock:
+            return sorted(self.values.items())
+
+    def render(self):
+        lines = self.header()
+        for key, value in self.samples():
+            lines.append(f"{self.name}{format_labels(self.labels, key)} {format_value(value)}")
+        return lines
+
+class Counter(Metric):
+    """A value that only goes up"""
+
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+class Gauge(Metric):
+    """
+    A value that goes up and down. Either set directly, or read from a
+    function at scrape time (returning a number, or a dict of label values
+    tuple -> number for labelled gauges).
+    """
+
+    kind = 'gauge'
+
+    def __init__(self, name, help_text, labels=()):
+        super().__init__(name, help_text, labels)
+        self.function = None
+
+    def set(self, value, **labels):
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = value
+
+    def set_function(self, function):
+        self.function = function
+
+    def samples(self):
+        if self.function is None:
+            return super().samples()
+        result = self.function()
+        if isinstance(result, dict):
+            return sorted(result.items())
+        return [((), result)]
+
+class Histogram(Metric):
+    """Counts of observations in cumulative buckets, plus their sum and count"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labels=(), buckets=POLL_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self.key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.values.get(key)
+            if series is None:
+                # Per-bucket counts (last one is +Inf), sum
+                series = self.values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def samples(self):
+        with self.lock:
+            return sorted((key, (list(counts), total)) for key, (counts, total) in self.values.items())
+
+    def render(self):
+        lines = self.header()
+        for key, (counts, total) in self.samples():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else format_value(bound)
+                lines.append(f"{self.name}_bucket{format_labels(self.labels, key, [('le', le)])} {cumulative}")
+            lines.append(f"{self.name}_sum{format_labels(self.labels, key)} {format_value(total)}")
+            lines.append(f"{self.name}_count{format_labels(self.labels, key)} {cumulative}")
+        return lines
+
+# The metrics recorded by the monitor
+POLL_SECONDS = Histogram('epoch_poll_duration_seconds', 'Time taken by one status check',
+                         ['monitor'], POLL_BUCKETS)
+POLL_ERRORS = Counter('epoch_poll_errors_total', 'Failed status checks by error type', ['monitor', 'type'])
+CHECKS = Counter('epoch_checks_total', 'Status checks run', ['monitor'])
+PARSE_SECONDS = Histogram('epoch_parse_duration_seconds', 'Time spent parsing status responses',
+                          ['source'], PARSE_BUCKETS)
+REALM_UP = Gauge('epoch_realm_up', 'Confirmed realm status (1 = UP, 0 = DOWN)', ['monitor', 'realm'])
+REALM_UNSTABLE = Gauge('epoch_realm_unstable', 'Realm is flapping (1) or not (0)', ['monitor', 'realm'])
+WEBHOOK_POST_SECONDS = Histogram('epoch_webhook_post_duration_seconds', 'Time taken by one webhook request',
+                                 ['webhook'], POST_BUCKETS)
+DELIVERY_SECONDS = Histogram('epoch_webhook_delivery_latency_seconds', 'Time from queueing to delivery of a message',
+                             ['webhook'], DELIVERY_BUCKETS)
+WEBHOOK_RETRIES = Counter('epoch_webhook_retries_total', 'Webhook requests retried, by reason', ['webhook', 'reason'])
+WEBHOOK_MESSAGES = Counter('epoch_webhook_messages_total', 'Messages by delivery result', ['webhook', 'result'])
+QUEUE_DEPTH = Gauge('epoch_delivery_queue_depth', 'Messages waiting for delivery', ['webhook'])
+CONSENSUS_EVENTS = Counter('epoch_consensus_events_total', 'Consensus checks, hedges, wins and disagreements',
+                           ['monitor', 'event'])
+
+ALL_METRICS = [POLL_SECONDS, POLL_ERRORS, CHECKS, PARSE_SECONDS, REALM_UP, REALM_UNSTABLE,
+               WEBHOOK_POST_SECONDS, DELIVERY_SECONDS, WEBHOOK_RETRIES, WEBHOOK_MESSAGES, QUEUE_DEPTH,
+               CONSENSUS_EVENTS]
+
+def render_metrics(metrics=None):
+    """Get all metrics in the Prometheus text exposition format"""
+    lines = []
+    for metric in metrics or ALL_METRICS:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+def make_handler():
+    """Get the request handler class serving /metrics, 404 for anything else"""
+    from http.server import BaseHTTPRequestHandler
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = render_metrics().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # Scrapes would flood the console otherwise
+            pass
+
+    return MetricsHandler
+
+class MetricsServer:
+    """The metrics endpoint, served from a background thread"""
+
+    def __init__(self, port, host=METRICS_HOST):
+        self.host = host
+        self.port = port
+        self.server = None
+        self.thread = None
+
+    def start(self):
+        from http.server import ThreadingHTTPServer
+        self.server = ThreadingHTTPServer((self.host, self.port), make_handler())
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, name='metrics', daemon=True)
+        self.thread.start()
+        print(f"📈 Metrics available at http://{self.host}:{self.port}/metrics")
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Epoch Status Profiling
+Per-phase timings for every check, enabled with --profile. Each check's
+phases (response, download, parse, diff, build) and every webhook send are
+kept in a ring buffer and summarised on exit or on SIGUSR1, so a slow cycle
+can be pinned on the upstream, the parser or Discord. "response" is the
+time until the response headers arrived: connecting, if the connection was
+not reused, plus the upstream's own time to answer. --profile-cycles N
+additionally runs the first N checks under cProfile.
+
+When profiling is off every hook is a single context variable lookup, and
+cProfile is only imported when asked for.
+"""
+
+import contextvars
+import signal
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Configuration
+PROFILE_HISTORY = 500  # checks and sends kept in the ring buffer
+PROFILE_FILE = 'profile.pstats'  # cProfile output of --profile-cycles
+PHASES = ["response", "download", "parse", "diff", "build", "send"]
+SLOWEST_SHOWN = 5  # slowest cycles listed in the summary
+
+_profiler = None
+# The record of the check running in this task (copied into its worker thread)
+_current = contextvars.ContextVar('profile_record', default=None)
+
+class Profiler:
+    """Ring buffer of cycle timings with an optional cProfile capture"""
+
+    def __init__(self, size=PROFILE_HISTORY, cprofile_cycles=0):
+        self.records = deque(maxlen=size)
+        self.lock = threading.Lock()
+        self.cycles = 0
+        self.cprofile = None
+        if cprofile_cycles > 0:
+            import cProfile
+            self.cprofile = cProfile.Profile()
+        self.cprofile_left = cprofile_cycles
+        self.cprofile_lock = threading.Lock()
+
+    def add(self, record):
+        with self.lock:
+            self.records.append(record)
+
+    @property
+    def capturing(self):
+        return self.cprofile is not None and self.cprofile_left > 0
+
+    def profile_call(self, func):
+        """Run one check under cProfile, writing the capture once enough checks have run"""
+        # cProfile follows one thread at a time, so captured checks run one by one
+        with self.cprofile_lock:
+            if not self.capturing:
+                return func()
+            try:
+                return self.cprofile.runcall(func)
+            finally:
+                self.cprofile_left -= 1
+                if self.cprofile_left == 0:
+                    self.write_cprofile()
+
+    def write_cprofile(self):
+        """Save the cProfile capture and print its top functions"""
+        import io
+        import pstats
+        self.cprofile.dump_stats(PROFILE_FILE)
+        output = io.StringIO()
+        pstats.Stats(self.cprofile, stream=output).sort_stats('cumulative').print_stats(15)
+        print(f"🔬 cProfile capture finished, saved to {PROFILE_FILE}")
+        print(output.getvalue())
+
+    def format_summary(self):
+        """Get per-phase statistics and the slowest cycles for log output"""
+        with self.lock:
+            records = list(self.records)
+        checks = [record for record in records if record["kind"] == "check"]
+        if not records:
+            return "⏱️  Profile: no checks recorded yet"
+
+        lines = [f"⏱️  Profile of the last {len(checks)} checks and {len(records) - len(checks)} sends "
+                 f"(ms: mean / p50 / p95 / max)"]
+        series = [(phase, [record["phases"][phase] for record in records if phase in record["phases"]])
+                  for phase in PHASES]
+        series.append(("check", [record["total"] for record in checks]))
+        for phase, values in series:
+            if values:
+                values.sort()
+                lines.append(f"   {phase:<9} {format_ms(sum(values) / len(values))} / "
+                             f"{format_ms(percentile(values, 0.5))} / {format_ms(percentile(values, 0.95))} / "
+                             f"{format_ms(values[-1])}  ({len(values)} samples)")
+
+        slowest = sorted(checks, key=lambda record: record["total"], reverse=True)[:SLOWEST_SHOWN]
+        if slowest:
+            lines.append("   Slowest checks:")
+            for record in slowest:
+                breakdown = ', '.join(f"{phase} {format_ms(record['phases'][phase])}"
+                                      for phase in PHASES if phase in record["phases"])
+                started = time.strftime('%H:%M:%S', time.localtime(record["started"]))
+                lines.append(f"   - {started} [{record['name']}] {format_ms(record['total'])} ms: {breakdown}")
+        return '\n'.join(lines)
+
+def format_ms(seconds):
+    return f"{seconds * 1000:.1f}"
+
+def percentile(values, fraction):
+    """Get a percentile from sorted values (nearest rank)"""
+    return values[min(int(fraction * len(values)), len(values) - 1)]
+
+def enable(size=PROFILE_HISTORY, cprofile_cycles=0):
+    """Turn profiling on for this process"""
+    global _profiler
+    _profiler = Profiler(size, cprofile_cycles)
+    if cprofile_cycles > 0:
+        print(f"🔬 Profiling enabled, capturing the first {cprofile_cycles} checks with cProfile")
+    else:
+        print("🔬 Profiling enabled")
+    return _profiler
+
+def handle_signal(loop):
+    """
+    Print the summary on SIGUSR1 without stopping (not available on Windows).
+
+    The summary is printed by the event loop rather than inside the signal
+    handler, which could interrupt a thread holding the profiler's lock or
+    in the middle of a print.
+    """
+    if _profiler is not None and hasattr(signal, 'SIGUSR1'):
+        loop.add_signal_handler(signal.SIGUSR1, print_summary)
+
+def start_cycle(name):
+    """
+    Start timing one check of the named monitor in the current task.
+
+    Returns:
+        dict or None: The cycle record, None if profiling is off
+    """
+    if _profiler is None:
+        return None
+    record = {"kind": "check", "name": name, "started": time.time(), "begin": time.perf_counter(),
+              "phases": {}, "total": 0.0}
+    _current.set(record)
+    return record
+
+def finish_cycle(record):
+    """Store a finished cycle in the ring buffer"""
+    if record is None:
+        return
+    _current.set(None)
+    record["total"] = time.perf_counter() - record.pop("begin")
+    _profiler.cycles += 1
+    _profiler.add(record)
+
+def wrap_check(func):
+    """Get the function to run for a check: func itself, or func under cProfile while capturing"""
+    if _profiler is None or not _profiler.capturing:
+        return func
+    return lambda: _profiler.profile_call(func)
+
+def add_time(phase, seconds):
+    """Add time spent in a phase to the current cycle, if one is being profiled"""
+    record = _current.get()
+    if record is not None:
+        record["phases"][phase] = record["phases"].get(phase, 0.0) + seconds
+
+@contextmanager
+def phase(name):
+    """Time a block as a phase of the current cycle"""
+    if _current.get() is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_time(name, time.perf_counter() - started)
+
+def record_send(name, seconds):
+    """Store one webhook request's timing in the ring buffer"""
+    if _profiler is not None:
+        _profiler.add({"kind": "send", "name": name, "started": time.time(), "phases": {"send": seconds},
+                       "total": seconds})
+
+def print_summary():
+    if _profiler is not None:
+        print(_profiler.format_summary())
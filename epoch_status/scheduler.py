@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Epoch Status Poll Scheduler
+Adaptive check interval: polls at the floor right after a status change or an
+upstream error, then, once nothing has happened for a long stable period,
+relaxes step by step toward the ceiling. The default ceiling keeps the
+interval at or below the 30 seconds the monitor always used, so only a
+configured max_check_interval trades detection time for fewer polls.
+"""
+
+import time
+
+# Configuration
+MIN_CHECK_INTERVAL = 10  # seconds, floor used during incidents
+MAX_CHECK_INTERVAL = 30  # seconds, ceiling reached after a long stable period
+INCIDENT_HOLD = 300  # seconds to keep polling at the floor after an incident
+STABLE_PERIOD = 900  # seconds without an incident (or since start) before the interval relaxes
+RELAX_FACTOR = 1.5  # interval multiplier per stable check once the hold is over
+
+class AdaptiveScheduler:
+    """
+    Decides how long to wait before a monitor's next check.
+    The clock is injectable so the schedule can be tested without waiting.
+    """
+
+    def __init__(self, floor=MIN_CHECK_INTERVAL, ceiling=MAX_CHECK_INTERVAL, start=None,
+                 hold=INCIDENT_HOLD, relax_factor=RELAX_FACTOR, stable_period=STABLE_PERIOD,
+                 clock=time.monotonic, name=None):
+        self.floor = floor
+        self.ceiling = max(ceiling, floor)
+        self.hold = hold
+        self.relax_factor = relax_factor
+        self.stable_period = stable_period
+        self.clock = clock
+        self.name = name
+        self.interval = min(max(start if start is not None else self.floor, self.floor), self.ceiling)
+        self.incident_at = None
+        self.stable_since = clock()  # last incident, or the start
+        self.decisions = []  # (time, interval, reason), most recent last
+
+    @property
+    def fixed(self):
+        return self.floor == self.ceiling
+
+    def next_interval(self, changed=False, error=False):
+        """
+        Record the outcome of a check and get the delay before the next one.
+
+        Args:
+            changed (bool): A realm changed status in this check
+            error (bool): The upstream failed or returned something unparseable
+
+        Returns:
+            float: Seconds until the next check
+        """
+        now = self.clock()
+        previous = self.interval
+
+        if changed or error:
+            self.incident_at = self.stable_since = now
+            self.interval = self.floor
+            reason = "status changed" if changed else "upstream error"
+        elif self.incident_at is not None and now - self.incident_at < self.hold:
+            self.interval = self.floor
+            reason = "holding after incident"
+        elif now - self.stable_since < self.stable_period:
+            # Not stable for long enough yet; keep the current pace
+            self.incident_at = None
+            reason = "waiting for a stable period"
+        else:
+            self.incident_at = None
+            self.interval = min(self.ceiling, self.interval * self.relax_factor)
+            reason = "stable"
+
+        if self.interval != previous:
+            self.log(now, reason)
+        return self.interval
+
+    def log(self, now, reason):
+        self.decisions.append((now, self.interval, reason))
+        del self.decisions[:-100]
+        prefix = f"[{self.name}] " if self.name else ""
+        print(f"⏱️  {prefix}Next check in {self.interval:.0f}s ({reason})")
@@ -0,0 +1,33 @@
+"""
+Epoch Status Sources
+Registry of the supported status websites. Add a StatusSource subclass and
+list it in SOURCE_CLASSES to support a new site. Adapter modules are only
+imported once a monitor uses their site, so e.g. the HTML parser is never
+loaded for a monitor of epoch-status.info.
+"""
+
+import importlib
+from .base import StatusSource
+
+# Status website URL -> "module:class" of its adapter, relative to this package
+SOURCE_CLASSES = {
+    'https://epoch-status.info/': 'epoch_info:EpochInfoSource',
+    'https://epoch.strykersoft.us/': 'strykersoft:StrykersoftSource',
+}
+
+_instances = {}
+
+def get_source(url):
+    """
+    Get the shared adapter for a status website URL.
+
+    Returns:
+        StatusSource or None: None if the website is not supported
+    """
+    if url not in SOURCE_CLASSES:
+        return None
+    if url not in _instances:
+        module_name, _, class_name = SOURCE_CLASSES[url].partition(':')
+        module = importlib.import_module(f'.{module_name}', __name__)
+        _instances[url] = getattr(module, class_name)()
+    return _instances[url]
@@ -0,0 +1,35 @@
+"""
+Epoch Status Source Adapter Interface
+"""
+
+def is_complete(statuses):
+    """Whether every status was parsed, so the body it came from needn't be handled again"""
+    return isinstance(statuses, dict) and None not in statuses.values()
+
+class StatusSource:
+    """
+    Base class for a status website adapter.
+
+    Subclasses set url, name and realms (realm name -> the identifier the
+    site uses for it) and implement fetch_status(). Everything else - diffing,
+    state, scheduling and delivery - is handled by the engine.
+    """
+
+    url = None
+    name = None
+    realms = {}
+    check_interval = 30  # default seconds between checks
+
+    def fetch_status(self, realms=None, cache_key=None):
+        """
+        Fetch the current status of the given realms. Called from a worker thread.
+
+        Args:
+            realms (list): Realm names from self.realms to read, all realms if None
+            cache_key: Conditional GET key, so each monitor sees every change
+
+        Returns:
+            dict or None: realm -> "UP"/"DOWN" (None if it could not be parsed),
+            or None if the upstream content is unchanged since the last fetch
+        """
+        raise NotImplementedError
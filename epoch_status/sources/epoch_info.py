@@ -0,0 +1,98 @@
+"""
+Epoch Status Source: https://epoch-status.info/
+Reads the status from the site's tRPC API. Only post.getStatus is asked
+for; the much larger uptime history is never needed for a check.
+"""
+
+import re
+import time
+from ..http_client import get_client
+from ..json_decode import loads, decode_after
+from .. import metrics, profiling
+from .base import StatusSource, is_complete
+
+# Configuration
+EPOCH_STATUS_URL = 'https://epoch-status.info/'
+STATUS_API_URL = 'https://epoch-status.info/api/trpc/post.getStatus'
+TRPC_BATCH_INPUT = '{"0":{"json":null,"meta":{"values":["undefined"]}}}'
+# What precedes the first result's payload in a batched tRPC response
+TRPC_RESULT_MARKER = re.compile(rb'"result"\s*:\s*\{\s*"data"\s*:\s*\{\s*"json"\s*:')
+
+def get_trpc_result(api_data):
+    """Get the json payload of the first result in a batched tRPC response, or None"""
+    if (isinstance(api_data, list) and len(api_data) > 0 and
+        "result" in api_data[0] and "data" in api_data[0]["result"] and
+        "json" in api_data[0]["result"]["data"]):
+        return api_data[0]["result"]["data"]["json"]
+    return None
+
+def decode_trpc_result(body):
+    """
+    Get the json payload of the first result in a batched tRPC response body,
+    decoding only that object instead of the whole batch.
+
+    Returns:
+        The payload, or None if the response does not have the expected structure
+    """
+    try:
+        return decode_after(body, TRPC_RESULT_MARKER)
+    except ValueError:
+        pass
+
+    # Laid out differently than expected: decode everything and walk it
+    try:
+        return get_trpc_result(loads(body))
+    except ValueError:
+        return None
+
+class EpochInfoSource(StatusSource):
+    """tRPC API client"""
+
+    url = EPOCH_STATUS_URL
+    name = 'epoch-status.info'
+    status_api_url = STATUS_API_URL
+    # Realm name -> key in the getStatus response
+    realms = {
+        "Auth": "auth",
+        "Kezan": "world1"
+    }
+
+    def fetch_status(self, realms=None, cache_key=None):
+        realms = realms or list(self.realms)
+
+        # Use the tRPC API endpoint to get server status only
+        params = {
+            "batch": "1",
+            "input": TRPC_BATCH_INPUT
+        }
+
+        print(f"🌐 [{self.name}] Fetching server status from API...")
+        statuses = get_client().get_if_changed(self.status_api_url, params=params, cache_key=cache_key,
+                                               parse=lambda content: self.parse_statuses(content, realms),
+                                               complete=is_complete)
+        if statuses is None:
+            return None
+
+        summary = ", ".join(f"{realm}: {status}" for realm, status in statuses.items())
+        print(f"🔍 [{self.name}] Current status - {summary}")
+        return statuses
+
+    def parse_statuses(self, content, realms):
+        """Read the realms' statuses from a getStatus response body, None for the ones it lacks"""
+        # Extract the status data from the first result
+        started = time.perf_counter()
+        status_json = decode_trpc_result(content)
+        if not isinstance(status_json, dict):
+            print("⚠️  Unexpected API response structure")
+            return {realm: None for realm in realms}
+
+        statuses = {}
+        for realm in realms:
+            if realm in self.realms:
+                statuses[realm] = "UP" if status_json.get(self.realms[realm], False) else "DOWN"
+            else:
+                statuses[realm] = None
+        parse_time = time.perf_counter() - started
+        profiling.add_time("parse", parse_time)
+        metrics.PARSE_SECONDS.observe(parse_time, source=self.name)
+        return statuses
@@ -0,0 +1,135 @@
+"""
+Epoch Status Source: https://epoch.strykersoft.us/
+Scrapes the status page HTML, reading each realm's status div in one
+streaming pass.
+"""
+
+import codecs
+import re
+import time
+from html.parser import HTMLParser
+from ..http_client import get_client
+from .. import metrics, profiling
+from .base import StatusSource, is_complete
+
+# Configuration
+EPOCH_STATUS_URL = 'https://epoch.strykersoft.us/'
+# EPOCH_STATUS_URL = 'http://localhost:8000/' # Testing with local server
+AUTH_STATUS = 'Auth Server'
+KEZAN_STATUS = 'Kezan (PvE)'
+
+# Whole words in a status div that mean the realm is up or down
+UP_WORDS = {'up', 'online'}
+DOWN_WORDS = {'down', 'offline'}
+
+class StatusPageParser(HTMLParser):
+    """
+    Single-pass parser that collects the text of the elements whose id is one
+    of the watched div IDs. It is fed the page as it streams in and reports
+    done as soon as every watched element has been closed.
+    """
+
+    def __init__(self, div_ids):
+        super().__init__(convert_charrefs=True)
+        self.wanted = set(div_ids)
+        self.texts = {}
+        self.current_id = None
+        self.current_tag = None
+        self.depth = 0
+
+    @property
+    def done(self):
+        return self.current_id is None and len(self.texts) == len(self.wanted)
+
+    def handle_starttag(self, tag, attrs):
+        if self.current_id is not None:
+            if tag == self.current_tag:
+                self.depth += 1
+            return
+
+        element_id = dict(attrs).get('id')
+        if element_id in self.wanted and element_id not in self.texts:
+            self.current_id = element_id
+            self.current_tag = tag
+            self.depth = 1
+            self.texts[element_id] = []
+
+    def handle_endtag(self, tag):
+        if self.current_id is not None and tag == self.current_tag:
+            self.depth -= 1
+            if self.depth == 0:
+                self.current_id = None
+
+    def handle_data(self, data):
+        if self.current_id is not None:
+            self.texts[self.current_id].append(data)
+
+def parse_status_text(text):
+    """
+    Get the status from a status div's text, matching whole words only
+    so e.g. "update" is not read as UP.
+
+    Returns:
+        str or None: "UP", "DOWN" or None if the text has neither
+    """
+    words = set(re.findall(r'[a-z]+', text.lower()))
+    if words & UP_WORDS:
+        return "UP"
+    if words & DOWN_WORDS:
+        return "DOWN"
+    return None
+
+def extract_statuses(chunks, div_ids, source=None):
+    """
+    Read the status page in one pass from an iterator of byte chunks,
+    stopping as soon as every div ID has been found. With source, the time
+    spent parsing (not waiting for the network) is recorded for that source.
+
+    Returns:
+        dict: div ID -> "UP"/"DOWN" (None if missing or unreadable)
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    parser = StatusPageParser(div_ids)
+    parse_time = 0.0
+
+    for chunk in chunks:
+        started = time.perf_counter()
+        parser.feed(decoder.decode(chunk))
+        parse_time += time.perf_counter() - started
+        if parser.done:
+            break
+
+    started = time.perf_counter()
+    statuses = {div_id: parse_status_text(''.join(parser.texts[div_id])) if div_id in parser.texts else None
+                for div_id in div_ids}
+    parse_time += time.perf_counter() - started
+    profiling.add_time("parse", parse_time)
+    if source:
+        metrics.PARSE_SECONDS.observe(parse_time, source=source)
+    return statuses
+
+class StrykersoftSource(StatusSource):
+    """Status page HTML scraper"""
+
+    url = EPOCH_STATUS_URL
+    name = 'epoch.strykersoft.us'
+    # Realm name -> div ID on the status page
+    realms = {
+        "Auth": AUTH_STATUS,
+        "Kezan": KEZAN_STATUS
+    }
+
+    def fetch_status(self, realms=None, cache_key=None):
+        realms = realms or list(self.realms)
+        div_ids = [self.realms.get(realm) for realm in realms]
+
+        # Stream the status page, reading only as far as the last status div
+        div_statuses = get_client().get_if_changed(
+            self.url, cache_key=cache_key,
+            consume=lambda chunks: extract_statuses(chunks, div_ids, self.name), complete=is_complete)
+        if div_statuses is None:
+            return None
+
+        statuses = {realm: div_statuses.get(self.realms.get(realm)) for realm in realms}
+        print(f"🔍 [{self.name}] Current status - " + ", ".join(f"{realm}: {status}" for realm, status in statuses.items()))
+        return statuses
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Epoch Status State Store
+Keeps the last-known status per monitor, the last notification time and any
+undelivered messages in a small JSON file, so a restart carries on where the
+previous run stopped instead of re-initializing and missing a transition.
+Every entry point has its own file (state_file_for()), so scripts running
+side by side in one folder never overwrite each other's state.
+"""
+
+import json
+import os
+import tempfile
+import time
+import uuid
+
+# Configuration
+STATE_FILE = 'state.json'  # the multi-source monitor's file
+
+def state_file_for(source_name=None):
+    """State file of a single-site script (state-<site>.json), STATE_FILE for the multi-source monitor"""
+    return f"state-{source_name}.json" if source_name else STATE_FILE
+
+class StateStore:
+    """
+    In-memory state that is written to disk atomically, and only when it changed.
+    Call save() whenever convenient; it does nothing if there is nothing new.
+    """
+
+    def __init__(self, path=STATE_FILE, legacy_path=None):
+        self.path = path
+        self.legacy_path = legacy_path  # shared file of older versions, read once if path doesn't exist yet
+        self.data = {"monitors": {}, "pending": {}}
+        self.dirty = False
+
+    def load(self):
+        """Load the state file if there is one; a missing or broken file starts empty"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.data["monitors"] = dict(data.get("monitors", {}))
+            self.data["pending"] = dict(data.get("pending", {}))
+            print(f"💾 Loaded saved state for {len(self.data['monitors'])} monitor(s) "
+                  f"and {len(self.data['pending'])} pending message(s)")
+        except FileNotFoundError:
+            self.load_legacy()
+            return
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Warning: Could not read {self.path}, starting fresh: {e}")
+        self.dirty = False
+
+    def load_legacy(self):
+        """
+        Take over the last-known statuses from the file older versions shared
+        between all scripts. Its pending messages are left to the script that
+        keeps using that file, so none is sent twice.
+        """
+        self.dirty = False
+        if not self.legacy_path or os.path.abspath(self.legacy_path) == os.path.abspath(self.path):
+            return
+        try:
+            with open(self.legacy_path, 'r', encoding='utf-8') as f:
+                monitors = dict(json.load(f).get("monitors", {}))
+        except (OSError, ValueError):
+            return
+        if monitors:
+            self.data["monitors"] = monitors
+            self.dirty = True
+            print(f"💾 Loaded saved state for {len(monitors)} monitor(s) from {self.legacy_path}")
+
+    def save(self):
+        """Write the state file atomically if anything changed since the last save"""
+        if not self.dirty:
+            return
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, temp_path = tempfile.mkstemp(prefix='.state-', suffix='.tmp', dir=directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self.data, f, ensure_ascii=False, indent=1)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+            self.dirty = False
+        except OSError as e:
+            print(f"⚠️  Warning: Could not write {self.path}: {e}")
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+    def get_statuses(self, monitor_name):
+        """Get the last saved realm -> status dict of a monitor, or None"""
+        return self.data["monitors"].get(monitor_name, {}).get("statuses")
+
+    def set_statuses(self, monitor_name, statuses):
+        """Remember the latest statuses of a monitor"""
+        monitor = self.data["monitors"].setdefault(monitor_name, {})
+        if monitor.get("statuses") != statuses:
+            monitor["statuses"] = dict(statuses)
+            self.dirty = True
+
+    def mark_notified(self, monitor_name, timestamp=None):
+        """Remember when a monitor last produced a notification"""
+        monitor = self.data["monitors"].setdefault(monitor_name, {})
+        monitor["last_notified"] = timestamp if timestamp is not None else time.time()
+        self.dirty = True
+
+    def add_pending(self, message, webhook_url, role_id=None):
+        """
+        Remember a message that still has to be delivered.
+
+        Returns:
+            str: ID to pass to remove_pending() once it has been handled
+        """
+        pending_id = uuid.uuid4().hex
+        self.data["pending"][pending_id] = {
+            "message": message,
+            "webhook_url": webhook_url,
+            "role_id": role_id,
+            "queued_at": time.time(),
+        }
+        self.dirty = True
+        return pending_id
+
+    def remove_pending(self, pending_id):
+        """Forget a message once it was delivered or given up on"""
+        if self.data["pending"].pop(pending_id, None) is not None:
+            self.dirty = True
+
+    def take_pending(self):
+        """
+        Remove and return every pending message, oldest first, to queue them again.
+
+        Returns:
+            list: dicts with "message", "webhook_url", "role_id" and "queued_at"
+        """
+        pending = sorted(self.data["pending"].values(), key=lambda entry: entry.get("queued_at", 0))
+        if pending:
+            self.data["pending"] = {}
+            self.dirty = True
+        return pending
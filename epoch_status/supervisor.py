@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Epoch Status Supervisor
+Runs many monitor configurations on one machine. Every *.txt file in the
+configuration directory is one deployment with its own webhooks, monitors
+and settings, in the config.txt format. Deployments are sharded across
+worker processes, one per CPU core by default, and each worker runs its
+deployments on one event loop.
+
+Workers share upstream responses through a disk or socket fetch cache, so
+a status page is downloaded once per cache TTL however many shards watch
+it. The fetch_cache settings of the deployments' files are not used.
+Each deployment keeps its own state and history files next to its
+configuration, so a crashed worker is restarted and carries on where it
+stopped.
+
+Usage:
+    python -m epoch_status.supervisor --config-dir configs --workers 4
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import time
+from .app import build_monitors, apply_config
+from .config import load_config, read_settings, ConfigWatcher
+from .delivery import DeliveryQueue
+from .engine import run_all, restore_state, describe_target, describe_monitor
+from .fetch_cache import create_cache, describe_cache, CACHE_KINDS, CACHE_DIR, CACHE_TTL, CACHE_PORT
+from .history import HistoryWriter
+from .http_client import set_fetch_cache, format_connection_stats, format_fetch_stats
+from .state import StateStore
+
+# Configuration
+CONFIG_DIR = 'configs'  # one <deployment>.txt per deployment
+SUPERVISE_INTERVAL = 1  # seconds between checks for exited workers
+RESTART_DELAY = 1  # seconds before restarting a crashed worker, doubled on every crash in a row
+MAX_RESTART_DELAY = 60  # seconds
+STABLE_RUN = 60  # seconds a worker must run before its restart delay is reset
+STOP_TIMEOUT = 10  # seconds workers get to save their state on Ctrl+C
+
+def find_deployments(directory=CONFIG_DIR):
+    """Get the configuration file of every deployment, sorted by name"""
+    try:
+        names = sorted(os.listdir(directory))
+    except OSError:
+        return []
+    return [os.path.join(directory, name) for name in names
+            if name.endswith('.txt') and os.path.isfile(os.path.join(directory, name))]
+
+def deployment_name(path):
+    return os.path.splitext(os.path.basename(path))[0]
+
+def deployment_file(path, suffix):
+    """Path of a deployment's state or history file, next to its configuration"""
+    return os.path.splitext(path)[0] + suffix
+
+def deployment_weight(path):
+    """Roughly how much work a deployment is: its number of monitors"""
+    try:
+        settings = read_settings(path)
+    except OSError:
+        return 1
+    urls = [url for url in settings.get('status_website_url', '').split(',') if url.strip()]
+    return max(len(settings['monitor']) or len(urls), 1)
+
+def shard_deployments(paths, workers):
+    """
+    Split deployments into shards of about the same number of monitors,
+    heaviest first onto the lightest shard.
+
+    Returns:
+        list: One list of configuration paths per shard
+    """
+    weights = {path: deployment_weight(path) for path in paths}
+    shards = [[] for _ in range(workers)]
+    loads = [0] * workers
+    for path in sorted(paths, key=weights.get, reverse=True):
+        index = loads.index(min(loads))
+        shards[index].append(path)
+        loads[index] += weights[path]
+    return [sorted(shard) for shard in shards if shard]
+
+async def run_deployment(path):
+    """Run one deployment's monitors until cancelled, reloading its configuration on change"""
+    name = deployment_name(path)
+    config = await asyncio.to_thread(load_config, path)
+    if config is None:
+        print(f"❌ [{name}] Invalid configuration in {path}, not monitoring it")
+        return
+
+    prefix = f"{name}/"
+    monitors = build_monitors(config.monitors, config, prefix)
+    if not monitors:
+        print(f"❌ [{name}] No monitors configured in {path}")
+        return
+    if config.metrics_port:
+        print(f"⚠️  [{name}] metrics_port is ignored under the supervisor")
+
+    for target in config.targets:
+        describe_target(target)
+    for monitor in monitors:
+        describe_monitor(monitor)
+
+    store = StateStore(deployment_file(path, '.state.json'))
+    store.load()
+    restore_state(store, monitors)
+    delivery = DeliveryQueue(store=store, coalesce_window=config.coalesce_window)
+    history = HistoryWriter(deployment_file(path, '.history.bin'))
+
+    def watch_config(group):
+        return ConfigWatcher(config, lambda old, new: apply_config(group, old, new, prefix=prefix), path=path).run()
+
+    try:
+        await run_all(monitors, delivery, list(config.targets), store, history, watchers=[watch_config])
+    finally:
+        store.save()
+        history.close()
+
+async def watch_supervisor():
+    """Return once the supervisor is gone, so a worker never keeps running unsupervised"""
+    supervisor = multiprocessing.parent_process()
+    while supervisor is None or supervisor.is_alive():
+        await asyncio.sleep(SUPERVISE_INTERVAL)
+    print("⚠️  Supervisor is gone, stopping the worker")
+
+async def run_deployments(paths):
+    """Run a shard's deployments until they end or the supervisor goes away"""
+    deployments = asyncio.gather(*[run_deployment(path) for path in paths])
+    watchdog = asyncio.ensure_future(watch_supervisor())
+    await asyncio.wait([deployments, watchdog], return_when=asyncio.FIRST_COMPLETED)
+    if deployments.done():
+        watchdog.cancel()
+        # Raises if a deployment crashed, so the worker exits with an error and is restarted
+        deployments.result()
+        return
+    deployments.cancel()
+    try:
+        await deployments
+    except asyncio.CancelledError:
+        pass
+
+def run_shard(index, paths, cache):
+    """Worker process: run a shard of deployments until Ctrl+C, sharing responses through the cache"""
+    set_fetch_cache(create_cache(**cache))
+    print(f"🧩 [shard {index}] Running {len(paths)} deployment(s) in process {os.getpid()}")
+    try:
+        asyncio.run(run_deployments(paths))
+    except KeyboardInterrupt:
+        print(f"⏹️  [shard {index}] Stopping...")
+        print(format_connection_stats())
+        print(format_fetch_stats())
+
+class Worker:
+    """One shard and the process currently running it"""
+
+    def __init__(self, index, paths):
+        self.index = index
+        self.paths = paths
+        self.process = None
+        self.started_at = 0
+        self.restart_delay = RESTART_DELAY
+        self.restart_at = None
+        self.restarts = 0
+        self.finished = False  # exited cleanly, not restarted
+
+class Supervisor:
+    """Starts a worker process per shard and restarts any that exit"""
+
+    def __init__(self, shards, cache):
+        self.workers = [Worker(index, paths) for index, paths in enumerate(shards, 1)]
+        self.cache = cache  # create_cache() arguments for the workers
+        self.terminated = False  # stopped by SIGTERM rather than Ctrl+C
+
+    def start(self, worker):
+        worker.process = multiprocessing.Process(target=run_shard, name=f"shard-{worker.index}", daemon=True,
+                                                 args=(worker.index, worker.paths, self.cache))
+        worker.process.start()
+        worker.started_at = time.monotonic()
+        worker.restart_at = None
+
+    def check(self, worker):
+        """Schedule a restart for a worker that exited, and do it once its delay has passed"""
+        if worker.finished or worker.process.is_alive():
+            return
+        if worker.process.exitcode == 0:
+            # Every deployment of the shard ended, e.g. all of them have invalid configurations
+            print(f"⚠️  [shard {worker.index}] Worker has nothing left to monitor, not restarting it")
+            worker.finished = True
+            return
+
+        now = time.monotonic()
+        if worker.restart_at is None:
+            if now - worker.started_at >= STABLE_RUN:
+                worker.restart_delay = RESTART_DELAY
+            print(f"💥 [shard {worker.index}] Worker exited with code {worker.process.exitcode}, "
+                  f"restarting in {worker.restart_delay}s")
+            worker.restart_at = now + worker.restart_delay
+            worker.restart_delay = min(worker.restart_delay * 2, MAX_RESTART_DELAY)
+        elif now >= worker.restart_at:
+            worker.restarts += 1
+            print(f"🔁 [shard {worker.index}] Restarting worker (restart #{worker.restarts})")
+            self.start(worker)
+
+    def run(self):
+        """Supervise the workers until Ctrl+C (or SIGTERM)"""
+        signal.signal(signal.SIGTERM, self.on_sigterm)
+        for worker in self.workers:
+            self.start(worker)
+        try:
+            while True:
+                time.sleep(SUPERVISE_INTERVAL)
+                for worker in self.workers:
+                    self.check(worker)
+        except KeyboardInterrupt:
+            print("\n\n⏹️  Stopping workers...")
+            self.stop()
+
+    def on_sigterm(self, signum, frame):
+        self.terminated = True
+        raise KeyboardInterrupt
+
+    def stop(self):
+        """Give the workers time to save their state, then end them"""
+        if self.terminated:
+            # Only the supervisor got the signal; Ctrl+C reaches the workers by itself
+            for worker in self.workers:
+                if worker.process.is_alive():
+                    os.kill(worker.process.pid, signal.SIGINT)
+        deadline = time.monotonic() + STOP_TIMEOUT
+        for worker in self.workers:
+            worker.process.join(max(deadline - time.monotonic(), 0))
+        for worker in self.workers:
+            if worker.process.is_alive():
+                print(f"⚠️  [shard {worker.index}] Worker did not stop in time, terminating it")
+                worker.process.terminate()
+                worker.process.join()
+        print("👋 Supervisor stopped successfully!")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run many monitor configurations across worker processes")
+    parser.add_argument('--config-dir', default=CONFIG_DIR,
+                        help=f"Directory with one config.txt-style file per deployment (default: {CONFIG_DIR})")
+    parser.add_argument('--workers', type=int, default=0,
+                        help="Worker processes (default: one per CPU core)")
+    parser.add_argument('--cache', choices=CACHE_KINDS, default='disk',
+                        help="How the workers share upstream responses (default: disk)")
+    parser.add_argument('--cache-dir', default=CACHE_DIR,
+                        help=f"Directory of the disk cache (default: {CACHE_DIR})")
+    parser.add_argument('--cache-port', type=int, default=CACHE_PORT,
+                        help=f"Local port of the socket cache (default: {CACHE_PORT})")
+    parser.add_argument('--cache-ttl', type=float, default=CACHE_TTL,
+                        help=f"Seconds a fetched response is reused (default: {CACHE_TTL})")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    print("🚀 Epoch Status Supervisor Starting...")
+    print("=" * 50)
+
+    paths = find_deployments(args.config_dir)
+    if not paths:
+        print(f"❌ Error: No deployment configurations (*.txt) found in {args.config_dir}")
+        return
+
+    workers = min(args.workers if args.workers > 0 else os.cpu_count() or 1, len(paths))
+    shards = shard_deployments(paths, workers)
+    print(f"✅ {len(paths)} deployment(s) in {len(shards)} worker process(es)")
+    for index, shard in enumerate(shards, 1):
+        print(f"🧩 [shard {index}] {', '.join(deployment_name(path) for path in shard)}")
+    cache = {"kind": args.cache, "ttl": args.cache_ttl, "directory": args.cache_dir, "port": args.cache_port}
+    print(describe_cache(**cache))
+    print("⏹️  Press Ctrl+C to stop monitoring")
+    print("-" * 50)
+
+    Supervisor(shards, cache).run()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,12 @@
+#!/usr/bin/env python3
+"""
+Epoch Status Supervisor
+Runs every deployment configuration in the configs/ folder (one
+config.txt-style file each) across worker processes, one per CPU core,
+and restarts any worker that crashes.
+"""
+
+from epoch_status.supervisor import main
+
+if __name__ == '__main__':
+    main()
@@ -30,6 +30,12 @@ if errorlevel 1 (
     exit /b 1
 )
 
+:: Skip pip, which takes seconds even when nothing changed, if requirements.txt
+:: is the same as at the last successful install
+if exist "venv\requirements.installed" (
+    fc /b "requirements.txt" "venv\requirements.installed" >nul 2>&1 && goto dependencies_ready
+)
+
 echo.
 echo Installing/updating dependencies...
 python -m pip install --upgrade pip
@@ -41,6 +47,14 @@ if errorlevel 1 (
     pause
     exit /b 1
 )
+copy /y "requirements.txt" "venv\requirements.installed" >nul
+goto check_config
+
+:dependencies_ready
+echo.
+echo Dependencies already installed.
+
+:check_config
 
 echo.
 echo Checking configuration...
@@ -59,6 +73,12 @@ for /f "usebackq tokens=1,2 delims==" %%a in ("config.txt") do (
     if "%%a"=="status_website_url" set "status_website_url=%%b"
 )
 
+:: Use the multi-source monitor when monitor= lines or several URLs are configured
+set "script_to_run="
+findstr /b /c:"monitor=" "config.txt" >nul && set "script_to_run=epoch_monitor.py"
+if not "%status_website_url%"=="" if not "%status_website_url:,=%"=="%status_website_url%" set "script_to_run=epoch_monitor.py"
+if defined script_to_run goto start_monitor
+
 :: Check if status_website_url is configured
 if "%status_website_url%"=="" (
     echo Error: status_website_url is not configured in config.txt
@@ -72,7 +92,6 @@ if "%status_website_url%"=="" (
 )
 
 :: Determine which script to run based on the URL
-set "script_to_run="
 if "%status_website_url%"=="https://epoch-status.info/" (
     set "script_to_run=epoch_info_webhook.py"
 ) else if "%status_website_url%"=="https://epoch.strykersoft.us/" (
@@ -88,6 +107,7 @@ if "%status_website_url%"=="https://epoch-status.info/" (
     exit /b 1
 )
 
+:start_monitor
 echo Starting Epoch Status Webhook Monitor...
 echo Virtual environment: %VIRTUAL_ENV%
 echo Website URL: %status_website_url%
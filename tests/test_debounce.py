@@ -0,0 +1,52 @@
+"""Recorded sample sequences run through the debouncing state machine"""
+
+from epoch_status.debounce import replay, Debouncer, CONFIRMED, UNSTABLE, SETTLED
+
+def test_first_sample_is_the_baseline():
+    assert replay(["DOWN"]) == []
+    assert replay(["UP", "UP", "UP"]) == []
+
+def test_down_confirmed_after_consecutive_samples():
+    samples = ["UP", "DOWN", "DOWN", "DOWN"]
+    assert replay(samples, confirm_down=2) == [(2, CONFIRMED, "DOWN")]
+    assert replay(samples, confirm_down=3) == [(3, CONFIRMED, "DOWN")]
+
+def test_single_failed_sample_is_not_announced():
+    assert replay(["UP", "DOWN", "UP", "UP", "DOWN", "UP"], confirm_down=2, flap_threshold=0) == []
+
+def test_outage_and_recovery():
+    samples = ["UP", "DOWN", "DOWN", "DOWN", "UP", "UP", "UP"]
+    assert replay(samples, confirm_down=2, confirm_up=3) == [(2, CONFIRMED, "DOWN"), (6, CONFIRMED, "UP")]
+
+def test_confirm_counts_of_one_announce_immediately():
+    samples = ["UP", "DOWN", "UP"]
+    assert replay(samples, confirm_down=1, confirm_up=1, flap_threshold=0) == [
+        (1, CONFIRMED, "DOWN"), (2, CONFIRMED, "UP")]
+
+def test_unparseable_samples_are_ignored():
+    samples = ["UP", "DOWN", None, "DOWN"]
+    assert replay(samples, confirm_down=2) == [(3, CONFIRMED, "DOWN")]
+
+def test_flapping_realm_is_announced_once_as_unstable_then_settles():
+    flapping = ["UP", "DOWN", "UP", "DOWN", "UP", "DOWN", "UP", "DOWN"]
+    settled = ["DOWN"] * 4
+    events = replay(["UP"] + flapping + settled, confirm_down=2, confirm_up=2,
+                    flap_window=10, flap_threshold=4, settle=5)
+    # Four flips mark it unstable; nothing more until five identical samples in a row
+    assert events == [(5, UNSTABLE, "UP"), (12, SETTLED, "DOWN")]
+
+def test_settled_realm_starts_a_fresh_flap_window():
+    samples = ["UP", "DOWN", "UP", "DOWN", "UP"] + ["UP"] * 5 + ["DOWN", "DOWN"]
+    events = replay(samples, confirm_down=2, confirm_up=2, flap_window=10, flap_threshold=4, settle=5)
+    assert events == [(4, UNSTABLE, "UP"), (8, SETTLED, "UP"), (11, CONFIRMED, "DOWN")]
+
+def test_flap_detection_can_be_turned_off():
+    samples = ["UP", "DOWN", "UP", "DOWN", "UP", "DOWN", "DOWN"]
+    assert replay(samples, confirm_down=2, flap_threshold=0) == [(6, CONFIRMED, "DOWN")]
+
+def test_seeded_debouncer_announces_without_a_new_baseline():
+    debouncer = Debouncer(["Auth", "Kezan"], confirm_down=2)
+    debouncer.seed({"Auth": "UP", "Kezan": "UP"})
+    assert debouncer.update({"Auth": "UP", "Kezan": "DOWN"}) == {}
+    assert debouncer.update({"Auth": "UP", "Kezan": "DOWN"}) == {"Kezan": CONFIRMED}
+    assert debouncer.confirmed == {"Auth": "UP", "Kezan": "DOWN"}
@@ -0,0 +1,149 @@
+"""Webhook rate limiting, driven by a fake clock and a stand-in Discord"""
+
+import asyncio
+
+from epoch_status import delivery
+from epoch_status.delivery import DeliveryQueue, RateLimitBucket, WebhookTarget, GLOBAL_RATE_LIMIT
+
+WEBHOOK = 'https://discord.com/api/webhooks/1/token'
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class FakeResponse:
+    def __init__(self, status_code=204, headers=None, body=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.body = body
+
+    def json(self):
+        if self.body is None:
+            raise ValueError("no body")
+        return self.body
+
+def rate_limited(retry_after, is_global=False):
+    headers = {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset-After': str(retry_after)}
+    if is_global:
+        headers = {'X-RateLimit-Global': 'true'}
+    return FakeResponse(429, headers, {"retry_after": retry_after, "global": is_global})
+
+def fake_discord(monkeypatch, clock, responses):
+    """Answer posts with the given responses (then 204s), returning (time, embeds) for every post"""
+    responses = list(responses)
+    posted_at = []
+
+    def post_webhook(webhook_url, payload):
+        posted_at.append((clock.now, len(payload.get("embeds", []))))
+        return responses.pop(0) if responses else FakeResponse()
+
+    monkeypatch.setattr(delivery, 'post_webhook', post_webhook)
+    return posted_at
+
+def fake_sleep(monkeypatch, clock):
+    """Make asyncio.sleep advance the fake clock instead of waiting, returning the sleeps"""
+    sleeps = []
+
+    async def sleep(seconds):
+        sleeps.append(seconds)
+        clock.now += seconds
+
+    monkeypatch.setattr(asyncio, 'sleep', sleep)
+    return sleeps
+
+def make_queue(clock):
+    queue = DeliveryQueue()
+    queue.global_bucket = RateLimitBucket(limit=GLOBAL_RATE_LIMIT, window=1, clock=clock)
+    queue.buckets[WEBHOOK] = RateLimitBucket(clock=clock)
+    return queue
+
+def test_bucket_paces_sends_within_the_window():
+    clock = FakeClock()
+    bucket = RateLimitBucket(limit=2, window=2, clock=clock)
+    for _ in range(2):
+        assert bucket.delay() == 0
+        bucket.consume()
+    assert bucket.delay() == 2
+
+    clock.now = 1
+    assert bucket.delay() == 1
+    clock.now = 2
+    assert bucket.delay() == 0
+    assert bucket.remaining == 2
+
+def test_bucket_follows_the_response_headers():
+    clock = FakeClock()
+    bucket = RateLimitBucket(clock=clock)
+    bucket.consume()
+    bucket.update({'X-RateLimit-Limit': '1', 'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset-After': '1.5'})
+    assert bucket.limit == 1
+    assert bucket.delay() == 1.5
+
+def test_empty_bucket_delays_the_next_send(monkeypatch):
+    clock = FakeClock()
+    posted_at = fake_discord(monkeypatch, clock, [
+        FakeResponse(headers={'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset-After': '2'})])
+    sleeps = fake_sleep(monkeypatch, clock)
+    queue = make_queue(clock)
+
+    async def send_twice():
+        return [await queue.deliver({}, WEBHOOK), await queue.deliver({}, WEBHOOK)]
+
+    assert asyncio.run(send_twice()) == [True, True]
+    assert [at for at, _ in posted_at] == [0, 2]
+    assert sleeps == [2]
+    assert queue.rate_limited == 0
+
+def test_rate_limited_send_waits_retry_after(monkeypatch):
+    clock = FakeClock()
+    posted_at = fake_discord(monkeypatch, clock, [rate_limited(3)])
+    sleeps = fake_sleep(monkeypatch, clock)
+    queue = make_queue(clock)
+
+    assert asyncio.run(queue.deliver({}, WEBHOOK)) is True
+    assert [at for at, _ in posted_at] == [0, 3]
+    assert sleeps == [3]
+    assert (queue.rate_limited, queue.posts) == (1, 1)
+
+def test_global_rate_limit_blocks_the_global_bucket(monkeypatch):
+    clock = FakeClock()
+    posted_at = fake_discord(monkeypatch, clock, [rate_limited(5, is_global=True)])
+    sleeps = fake_sleep(monkeypatch, clock)
+    queue = make_queue(clock)
+
+    assert asyncio.run(queue.deliver({}, WEBHOOK)) is True
+    assert [at for at, _ in posted_at] == [0, 5]
+    assert sleeps == [5]
+    # The wait came from the bucket shared by every webhook, not this webhook's own
+    assert queue.buckets[WEBHOOK].reset_at < 5
+    assert queue.global_bucket.reset_at > 5
+
+def test_gives_up_after_too_many_rate_limits(monkeypatch):
+    clock = FakeClock()
+    posted_at = fake_discord(monkeypatch, clock, [rate_limited(1)] * (delivery.MAX_RATE_LIMITED + 1))
+    fake_sleep(monkeypatch, clock)
+    queue = make_queue(clock)
+
+    assert asyncio.run(queue.deliver({}, WEBHOOK)) is False
+    assert len(posted_at) == delivery.MAX_RATE_LIMITED + 1
+    assert queue.posts == 0
+
+def test_messages_are_sent_without_waiting_for_more(monkeypatch):
+    clock = FakeClock()
+    posted_at = fake_discord(monkeypatch, clock, [])
+    queue = make_queue(clock)
+    target = WebhookTarget(WEBHOOK)
+
+    async def send():
+        # Messages queued together still share a post; nothing waits for later ones
+        together = [queue.submit("Auth is DOWN", target), queue.submit("Kezan is DOWN", target)]
+        assert await asyncio.gather(*together) == [True, True]
+        assert await asyncio.wait_for(queue.submit("Auth is UP", target), 1) is True
+        for worker in queue.workers.values():
+            worker.cancel()
+
+    asyncio.run(send())
+    assert [embeds for _, embeds in posted_at] == [2, 1]
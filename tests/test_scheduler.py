@@ -0,0 +1,77 @@
+"""Adaptive polling decisions, driven by a fake clock"""
+
+from epoch_status.scheduler import AdaptiveScheduler
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def make_scheduler(**settings):
+    clock = FakeClock()
+    settings.setdefault('hold', 300)
+    settings.setdefault('stable_period', 900)
+    return AdaptiveScheduler(clock=clock, **settings), clock
+
+def run_stable(scheduler, clock, seconds):
+    """Stable checks for that many seconds, returning every interval chosen"""
+    intervals = []
+    end = clock.now + seconds
+    while clock.now < end:
+        interval = scheduler.next_interval()
+        intervals.append(interval)
+        clock.now += interval
+    return intervals
+
+def test_start_interval_is_kept_within_bounds():
+    assert make_scheduler(floor=10, ceiling=120, start=30)[0].interval == 30
+    assert make_scheduler(floor=10, ceiling=120, start=5)[0].interval == 10
+    assert make_scheduler(floor=10, ceiling=20, start=30)[0].interval == 20
+
+def test_change_and_error_drop_to_the_floor():
+    scheduler, clock = make_scheduler(floor=10, ceiling=120, start=60)
+    assert scheduler.next_interval(changed=True) == 10
+
+    scheduler, clock = make_scheduler(floor=10, ceiling=120, start=60)
+    assert scheduler.next_interval(error=True) == 10
+
+def test_floor_is_held_after_an_incident():
+    scheduler, clock = make_scheduler(floor=10, ceiling=120, start=30)
+    scheduler.next_interval(changed=True)
+    clock.now += 10
+    intervals = run_stable(scheduler, clock, 280)
+    assert set(intervals) == {10}
+
+def test_no_relaxing_before_a_stable_period():
+    scheduler, clock = make_scheduler(floor=10, ceiling=120, start=30)
+    intervals = run_stable(scheduler, clock, 890)
+    assert set(intervals) == {30}
+
+def test_relaxes_to_the_ceiling_once_stable():
+    scheduler, clock = make_scheduler(floor=10, ceiling=120, start=30)
+    run_stable(scheduler, clock, 900)
+    intervals = run_stable(scheduler, clock, 600)
+    assert intervals == sorted(intervals)
+    assert intervals[0] > 30
+    assert intervals[-1] == 120
+
+def test_incident_restarts_the_stable_period():
+    scheduler, clock = make_scheduler(floor=10, ceiling=120, start=30)
+    run_stable(scheduler, clock, 1200)
+    assert scheduler.interval == 120
+
+    scheduler.next_interval(error=True)
+    clock.now += 10
+    # Holding at the floor, then no relaxing until stable_period after the error
+    intervals = run_stable(scheduler, clock, 880)
+    assert set(intervals) == {10}
+    intervals = run_stable(scheduler, clock, 300)
+    assert intervals[-1] > 10
+
+def test_fixed_interval_never_changes():
+    scheduler, clock = make_scheduler(floor=30, ceiling=30)
+    assert scheduler.fixed
+    assert scheduler.next_interval(changed=True) == 30
+    assert set(run_stable(scheduler, clock, 2000)) == {30}